@@ -1,38 +1,41 @@
 import pandas as pd
-from datetime import datetime, timedelta
-from main import compute_recommendation
-from datasource import fetch_option_chain_data
+from datetime import datetime
+from trading_calendar import get_trading_calendar
+from snapshots import get_snapshot_store
 
 symbol = "SPY"
 start_date = datetime(2024, 1, 1)
 end_date = datetime(2024, 4, 1)
 capital = 1000
+HOLD_DAYS = 10  # holding period in trading sessions
+MAX_STALENESS = pd.Timedelta(days=4)  # same bound chains_as_of uses for entries
 log_rows = []
 
-date = start_date
-while date <= end_date:
+calendar = get_trading_calendar()
+store = get_snapshot_store()
+for date in calendar.sessions_in_range(start_date, end_date):
     print(f"Simulating {date.strftime('%Y-%m-%d')}")
-    result = compute_recommendation(symbol, "Yahoo Finance (default)")
-    if isinstance(result, str):
-        date += timedelta(days=1)
-        continue
-    contracts = result['options_chains']
+    # Point-in-time chains recorded on that session, not today's live chain (reads only;
+    # nothing is fetched or recorded inside the loop)
+    contracts = store.chains_as_of(symbol, date + pd.Timedelta(days=1), MAX_STALENESS)
     if not contracts:
-        date += timedelta(days=1)
         continue
     # Pick top contract as usual
-    top = contracts[next(iter(contracts))]  # get first expiry
+    expiry = next(iter(contracts))  # get first expiry
+    top = contracts[expiry]
     if top is None or top.calls.empty:
-        date += timedelta(days=1)
         continue
     first_call = top.calls.iloc[0]
     entry_price = float(first_call['ask'])
-    expiry = first_call['expiry']
     strike = float(first_call['strike'])
     option_type = "call"
     # Simulate holding for HOLD_DAYS
-    exit_date = date + timedelta(days=10)
-    exit_chain = fetch_option_chain_data(symbol, expiry, "Yahoo Finance (default)")
+    exit_date = calendar.sessions_ahead(date, HOLD_DAYS)
+    # Skip the trade when no snapshot was recorded near the exit session, rather than
+    # settling on an older (possibly entry-day) chain.
+    exit_chain = store.load_chain(symbol, expiry, exit_date + pd.Timedelta(days=1), max_staleness=MAX_STALENESS)
+    if exit_chain is None:
+        continue
     exit_opt_row = exit_chain.calls[exit_chain.calls['strike'] == strike]
     exit_price = float(exit_opt_row['ask'].iloc[0]) if not exit_opt_row.empty else None
     realized_outcome = (exit_price - entry_price) / entry_price if exit_price else None
@@ -48,7 +51,6 @@ while date <= end_date:
         "exit_price": exit_price,
         "realized_outcome": realized_outcome
     })
-    date += timedelta(days=1)
 
 pd.DataFrame(log_rows).to_csv("backtest_results.csv", index=False)
 print("Backtest simulation complete.")
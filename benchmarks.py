@@ -0,0 +1,216 @@
+# benchmarks.py
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from config import CACHE_DIR
+from datasource import fetch_history_offline, TRAINING_DATA_PATH
+from technicals import compute_technical_indicators
+from options import find_best_options
+from montecarlo import simulate_price_paths, estimate_drift_vol
+from snapshots import Chain
+
+# Offline speed benchmarks for the hot paths. Each case is timed over a range of
+# sizes (a scaling curve); results are saved per commit under cache/benchmarks/
+# and compared against the previous run so slowdowns are flagged.
+#
+#     python benchmarks.py              # quick grid, compare with last run
+#     python benchmarks.py --full       # up to 10,000 strikes x 20 expiries
+#     python benchmarks.py --only find_best_options --plot
+
+BENCH_DIR = os.path.join(CACHE_DIR, "benchmarks")
+REGRESSION_THRESHOLD = 1.25
+
+def synthetic_option_chains(underlying_price=100.0, n_strikes=100, n_expiries=5, seed=0):
+    rng = np.random.default_rng(seed)
+    today = datetime.today().date()
+    strikes = np.round(np.linspace(underlying_price * 0.5, underlying_price * 1.5, n_strikes), 2)
+    chains = {}
+    for i in range(n_expiries):
+        exp_date = (today + timedelta(days=7 * (i + 1))).strftime("%Y-%m-%d")
+        sides = {}
+        for kind in ("call", "put"):
+            intrinsic = np.maximum(strikes - underlying_price if kind == "put" else underlying_price - strikes, 0)
+            mid = intrinsic + underlying_price * 0.02 * np.sqrt(i + 1) * rng.uniform(0.5, 1.5, n_strikes)
+            half_spread = np.maximum(mid * 0.025, 0.01)
+            sides[kind] = pd.DataFrame({
+                'strike': strikes,
+                'bid': np.maximum(mid - half_spread, 0.0),
+                'ask': mid + half_spread,
+                'impliedVolatility': rng.uniform(0.2, 0.8, n_strikes),
+                'openInterest': rng.integers(0, 5000, n_strikes),
+                'volume': rng.integers(0, 2000, n_strikes),
+            })
+        chains[exp_date] = Chain(sides['call'], sides['put'])
+    return chains
+
+def _history(rows):
+    df = fetch_history_offline("NVDA")
+    return df.tail(rows)
+
+def _available_symbols():
+    files = glob.glob(os.path.join(TRAINING_DATA_PATH, "*_historical_data.csv"))
+    return sorted(os.path.basename(f).split("_")[0] for f in files)
+
+def benchmark_cases(full=False):
+    # name -> (size label, [(size, x value, callable)])
+    strike_grid = [10, 100, 1000] + ([10000] if full else [])
+    expiry_grid = [1, 5] + ([20] if full else [])
+    cases = {}
+    cases['compute_technical_indicators'] = ("rows", [
+        (rows, rows, lambda df=_history(rows): compute_technical_indicators(df))
+        for rows in (250, 1000, 5000)
+    ])
+    option_sizes = []
+    for n_expiries in expiry_grid:
+        for n_strikes in strike_grid:
+            chains = synthetic_option_chains(100.0, n_strikes, n_expiries)
+            option_sizes.append((f"{n_strikes}x{n_expiries}", n_strikes * n_expiries,
+                                 lambda chains=chains: find_best_options(chains, 100.0, "call", 10000, top_n=3)))
+    cases['find_best_options'] = ("strikes x expiries", option_sizes)
+    close = fetch_history_offline("NVDA")['Close'].tail(1000)
+    mu, sigma = estimate_drift_vol(close)
+    cases['simulate_price_paths'] = ("n_sims", [
+        (n_sims, n_sims, lambda n_sims=n_sims: simulate_price_paths(close.iloc[-1], mu, sigma, n_days=30, n_sims=n_sims, seed=0))
+        for n_sims in (1000, 10000, 100000)
+    ])
+    load_sizes = []
+    for symbol in _available_symbols():
+        fn = os.path.join(TRAINING_DATA_PATH, f"{symbol}_historical_data.csv")
+        with open(fn) as f:
+            rows = sum(1 for _ in f) - 1
+        load_sizes.append((symbol, rows, lambda symbol=symbol: fetch_history_offline(symbol)))
+    cases['fetch_history_offline'] = ("rows", sorted(load_sizes, key=lambda s: s[1]))
+    return cases
+
+def time_call(func, repeat=5):
+    func()  # warm-up (imports, caches, first-touch allocations)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {'median': statistics.median(samples), 'min': min(samples)}
+
+def scaling_exponent(xs, ys):
+    # Slope of log(time) vs log(size): ~1 is linear, ~2 quadratic.
+    xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+    if len(xs) < 2 or np.ptp(np.log(xs)) == 0:
+        return None
+    return float(np.polyfit(np.log(xs), np.log(ys), 1)[0])
+
+def run_benchmarks(full=False, repeat=5, only=None):
+    results = {}
+    for name, (label, sizes) in benchmark_cases(full).items():
+        if only and name not in only:
+            continue
+        points = {}
+        for size, x, func in sizes:
+            stats = time_call(func, repeat)
+            stats['x'] = x
+            points[str(size)] = stats
+            print(f"{name:32s} {label}={size!s:12s} median {stats['median'] * 1000:10.3f} ms")
+        exponent = scaling_exponent([p['x'] for p in points.values()], [p['median'] for p in points.values()])
+        results[name] = {'label': label, 'points': points, 'scaling_exponent': exponent}
+    return results
+
+def current_commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except Exception:
+        return "unknown"
+
+def save_results(results, commit):
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    path = os.path.join(BENCH_DIR, f"{commit}.json")
+    with open(path, 'w') as f:
+        json.dump({'commit': commit, 'timestamp': datetime.now().isoformat(), 'results': results}, f, indent=2)
+    return path
+
+def load_baseline(compare=None, exclude=None):
+    if compare:
+        path = compare if os.path.exists(compare) else os.path.join(BENCH_DIR, f"{compare}.json")
+    else:
+        runs = [p for p in glob.glob(os.path.join(BENCH_DIR, "*.json")) if p != exclude]
+        if not runs:
+            return None
+        path = max(runs, key=os.path.getmtime)
+    with open(path) as f:
+        return json.load(f)
+
+def find_regressions(results, baseline, threshold=REGRESSION_THRESHOLD):
+    regressions = []
+    for name, res in results.items():
+        old = baseline['results'].get(name, {}).get('points', {})
+        for size, stats in res['points'].items():
+            if size in old and old[size]['median'] > 0:
+                ratio = stats['median'] / old[size]['median']
+                if ratio > threshold:
+                    regressions.append((name, size, old[size]['median'], stats['median'], ratio))
+    return regressions
+
+def plot_scaling(results, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for name, res in results.items():
+        fig = Figure(figsize=(6, 4))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        xs = [p['x'] for p in res['points'].values()]
+        ys = [p['median'] * 1000 for p in res['points'].values()]
+        ax.loglog(xs, ys, marker='o')
+        ax.set_xlabel(res['label'])
+        ax.set_ylabel("median ms")
+        exponent = res['scaling_exponent']
+        ax.set_title(f"{name}" + (f" (slope {exponent:.2f})" if exponent is not None else ""))
+        ax.grid(alpha=0.3, which='both')
+        fig.tight_layout()
+        path = os.path.join(out_dir, f"{name}.png")
+        fig.savefig(path)
+        paths.append(path)
+    return paths
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for indicators, option ranking, Monte Carlo and data loading.")
+    parser.add_argument("--full", action="store_true", help="Include 10,000 strikes and 20 expiries")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="Benchmark names to run")
+    parser.add_argument("--compare", help="Baseline commit or results file (default: most recent run)")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="Flag medians slower than baseline by this ratio")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--plot", action="store_true", help="Write scaling-curve PNGs next to the results")
+    args = parser.parse_args(argv)
+
+    commit = current_commit()
+    results = run_benchmarks(args.full, args.repeat, args.only)
+    for name, res in results.items():
+        if res['scaling_exponent'] is not None:
+            print(f"{name}: time ~ size^{res['scaling_exponent']:.2f}")
+    path = None if args.no_save else save_results(results, commit)
+    if args.plot:
+        for p in plot_scaling(results, os.path.join(BENCH_DIR, commit)):
+            print("Wrote", p)
+    baseline = load_baseline(args.compare, exclude=path)
+    if baseline is None:
+        print("No baseline run to compare against.")
+        return 0
+    regressions = find_regressions(results, baseline, args.threshold)
+    print(f"Compared with {baseline['commit']}: {len(regressions)} regression(s)")
+    for name, size, old, new, ratio in regressions:
+        print(f"  REGRESSION {name} [{size}]: {old * 1000:.3f} ms -> {new * 1000:.3f} ms ({ratio:.2f}x)")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
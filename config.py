@@ -3,3 +3,9 @@
 DEFAULT_ALPHA_VANTAGE_KEY = "P1F5WZ9A0WDL0UGF"
 DEFAULT_POLYGON_KEY = "AeycVwodfAxbIYNhCJuppZNZMFxBX3G8"
 TRADE_LOG_PATH = "trade_log.csv"
+CACHE_DIR = "cache"
+TRADING_CALENDAR_CACHE_PATH = "cache/nyse_sessions.npy"
+OPTION_SNAPSHOT_DIR = "cache/option_snapshots"
+RECORD_OPTION_SNAPSHOTS = True
+METRICS_PATH = "cache/metrics.prom"
+NEWS_CACHE_DIR = "cache/news"
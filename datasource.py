@@ -8,12 +8,32 @@ import os
 import numpy as np
 from datetime import timedelta
 
+from config import RECORD_OPTION_SNAPSHOTS
+from snapshots import get_snapshot_store
+from sentiment import get_sentiment_service
+from metrics import timed, incr
+
 TRAINING_DATA_PATH = r"/Users/wan/Desktop/stock_model/Jacky Quant Attempt /training_dataset"
+if not os.path.isdir(TRAINING_DATA_PATH):
+    # Fall back to the training_dataset folder shipped next to this file
+    TRAINING_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "training_dataset")
+
+def _count_response(resp, *args, **kwargs):
+    incr("network_calls")
+    incr("bytes_fetched", len(resp.content))
+
+def _http_get(url, **kwargs):
+    resp = requests.get(url, **kwargs)
+    _count_response(resp)
+    return resp
 
 def fetch_current_price_offline(symbol):
     fn = os.path.join(TRAINING_DATA_PATH, f"{symbol}_history.csv")
     if not os.path.exists(fn):
-        return None
+        # Fall back to the last close of the {symbol}_historical_data.csv used for history
+        fn = os.path.join(TRAINING_DATA_PATH, f"{symbol}_historical_data.csv")
+        if not os.path.exists(fn):
+            return None
     df = pd.read_csv(fn)
     return float(df['Close'].iloc[-1])
 
@@ -22,13 +42,35 @@ def fetch_history_offline(symbol, period='1y'):
     if not os.path.exists(fn):
         print(f"File not found: {fn}")
         return pd.DataFrame()
-    df = pd.read_csv(fn, index_col=0, parse_dates=True)
+    df = pd.read_csv(fn, index_col=0)
+    # Timestamps carry -05:00/-04:00 offsets across DST, which read_csv leaves as strings.
+    df.index = pd.to_datetime(df.index, utc=True).tz_convert('America/New_York')
     return df
 
-def fetch_options_chain_offline(symbol):
-    # List expiries as all files matching {symbol}_*_options.csv
-    files = [f for f in os.listdir(TRAINING_DATA_PATH) if f.startswith(f"{symbol}_") and f.endswith("_options.csv")]
-    return [f.split("_")[1] for f in files]
+_offline_expiries = None
+
+def fetch_options_chain_offline(symbol, refresh=False):
+    # List expiries as all files matching {symbol}_*_options.csv; the directory is scanned once.
+    global _offline_expiries
+    if _offline_expiries is None or refresh:
+        _offline_expiries = {}
+        if os.path.isdir(TRAINING_DATA_PATH):
+            for f in os.listdir(TRAINING_DATA_PATH):
+                if f.endswith("_options.csv"):
+                    sym, exp = f.split("_")[:2]
+                    _offline_expiries.setdefault(sym, []).append(exp)
+    return sorted(_offline_expiries.get(symbol, []))
+
+_yf_session = None
+
+def _yf_ticker(symbol):
+    # yfinance issues its own requests (including cookie/crumb fetches); a shared
+    # session with a response hook counts each of them like _http_get does.
+    global _yf_session
+    if _yf_session is None:
+        _yf_session = requests.Session()
+        _yf_session.hooks['response'].append(_count_response)
+    return yf.Ticker(symbol, session=_yf_session)
 
 def fetch_option_chain_data_offline(symbol, exp_date):
     fn = os.path.join(TRAINING_DATA_PATH, f"{symbol}_{exp_date}_options.csv")
@@ -49,18 +91,19 @@ def fetch_option_chain_data_offline(symbol, exp_date):
 
 
 
+@timed()
 def fetch_current_price(symbol, data_source, av_api_key=None, polygon_api_key=None, offline_mode=False):
     if offline_mode:
         return fetch_current_price_offline(symbol)
     if data_source == "Yahoo Finance (default)":
-        ticker = yf.Ticker(symbol)
+        ticker = _yf_ticker(symbol)
         data = ticker.history(period='1d')
         if data.empty:
             return None
         return float(data['Close'].iloc[0])
     elif data_source == "Alpha Vantage":
         url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={av_api_key}"
-        resp = requests.get(url)
+        resp = _http_get(url)
         data = resp.json()
         try:
             return float(data["Global Quote"]["05. price"])
@@ -68,7 +111,7 @@ def fetch_current_price(symbol, data_source, av_api_key=None, polygon_api_key=No
             return None
     elif data_source == "Polygon.io":
         url = f"https://api.polygon.io/v2/aggs/ticker/{symbol}/prev?adjusted=true&apiKey={polygon_api_key}"
-        resp = requests.get(url)
+        resp = _http_get(url)
         try:
             close = resp.json()["results"][0]["c"]
             return float(close)
@@ -77,15 +120,16 @@ def fetch_current_price(symbol, data_source, av_api_key=None, polygon_api_key=No
     else:
         raise NotImplementedError
 
+@timed()
 def fetch_history(symbol, data_source, period, av_api_key=None, polygon_api_key=None, offline_mode=False):
     if offline_mode:
             return fetch_history_offline(symbol, period)
     if data_source == "Yahoo Finance (default)":
-        ticker = yf.Ticker(symbol)
+        ticker = _yf_ticker(symbol)
         return ticker.history(period=period)
     elif data_source == "Alpha Vantage":
         url = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY_ADJUSTED&symbol={symbol}&outputsize=full&apikey={av_api_key}"
-        resp = requests.get(url)
+        resp = _http_get(url)
         data = resp.json().get("Time Series (Daily)", {})
         if not data:
             return pd.DataFrame()
@@ -102,7 +146,7 @@ def fetch_history(symbol, data_source, period, av_api_key=None, polygon_api_key=
         return df
     elif data_source == "Polygon.io":
         url = f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/1/day/2022-01-01/{datetime.now().strftime('%Y-%m-%d')}?adjusted=true&sort=desc&apiKey={polygon_api_key}"
-        resp = requests.get(url)
+        resp = _http_get(url)
         results = resp.json().get("results", [])
         if not results:
             return pd.DataFrame()
@@ -114,47 +158,35 @@ def fetch_history(symbol, data_source, period, av_api_key=None, polygon_api_key=
     else:
         raise NotImplementedError
 
+@timed()
 def fetch_options_chain(symbol, data_source, offline_mode=False):
     if offline_mode:
-        return fetch_history_offline(symbol)
+        return fetch_options_chain_offline(symbol)
     if data_source == "Yahoo Finance (default)":
-        return yf.Ticker(symbol).options
+        return _yf_ticker(symbol).options
     else:
         return []
 
-def fetch_option_chain_data(symbol, exp_date, data_source, offline_mode=False):
+@timed()
+def fetch_option_chain_data(symbol, exp_date, data_source, offline_mode=False, as_of=None):
+    if as_of is not None:
+        return get_snapshot_store().load_chain(symbol, exp_date, as_of)
     if offline_mode:
         return fetch_option_chain_data_offline(symbol, exp_date)
     if data_source == "Yahoo Finance (default)":
-        return yf.Ticker(symbol).option_chain(exp_date)
+        chain = _yf_ticker(symbol).option_chain(exp_date)
+        if RECORD_OPTION_SNAPSHOTS:
+            try:
+                get_snapshot_store().record(symbol, exp_date, chain)
+            except Exception as e:
+                print("Could not record option snapshot:", e)
+        return chain
     else:
         return None
 
+@timed()
 def fetch_news_sentiment(ticker, api_key, date=None, num_articles=8):
-    import numpy as np
-    from datetime import datetime
-    import pandas as pd
+    # Served from the per-(ticker, day) cache in sentiment.py; only uncached days hit the API.
     if not api_key:
         return None, "API key missing."
-    if not date:
-        date = datetime.now().strftime("%Y%m%dT0000")
-    else:
-        date = pd.to_datetime(date).strftime("%Y%m%dT0000")
-    next_date = (pd.to_datetime(date[:8]) + pd.Timedelta(days=1)).strftime("%Y%m%dT0000")
-    url = (
-        f"https://www.alphavantage.co/query?function=NEWS_SENTIMENT"
-        f"&tickers={ticker}&time_from={date}&time_to={next_date}&limit={num_articles}&apikey={api_key}"
-    )
-    try:
-        resp = requests.get(url, timeout=10)
-        data = resp.json()
-        if "feed" in data:
-            scores = []
-            for article in data["feed"]:
-                score = float(article.get("overall_sentiment_score", 0))
-                scores.append(score)
-            avg_score = np.mean(scores) if scores else 0
-            return avg_score, None
-        return None, "No news found."
-    except Exception as e:
-        return None, str(e)
+    return get_sentiment_service(api_key, http_get=_http_get).score(ticker, date, limit=max(num_articles, 50))
@@ -1,73 +1,19 @@
 # main.py
 
-import pandas as pd
+import matplotlib
+matplotlib.use("TkAgg")
 import threading
+import argparse
+from contextlib import ExitStack
 from datetime import datetime
 import FreeSimpleGUI as sg  # or PySimpleGUI as sg
 
-from config import DEFAULT_ALPHA_VANTAGE_KEY, DEFAULT_POLYGON_KEY, TRADE_LOG_PATH
-from datasource import (
-    fetch_current_price, fetch_history, fetch_options_chain, fetch_option_chain_data, fetch_news_sentiment
-)
-from technicals import compute_technical_indicators, compute_signals
+from config import DEFAULT_ALPHA_VANTAGE_KEY, DEFAULT_POLYGON_KEY, TRADE_LOG_PATH, METRICS_PATH
+from recommendation import compute_recommendation, is_us_market_open
 from options import find_best_options
 from plotting import plot_signals_and_explanations
 from logging_utils import log_trade_result
-import pandas_market_calendars as mcal
-
-def is_us_market_open(date=None):
-    nyse = mcal.get_calendar('NYSE')
-    date = pd.Timestamp(date or datetime.now().date())
-    schedule = nyse.valid_days(start_date=date, end_date=date)
-    return len(schedule) > 0
-
-def compute_recommendation(symbol, data_source, news_sentiment=False, api_key=None, polygon_api_key=None, offline_mode=False):
-    try:
-        symbol = symbol.strip().upper()
-        if not symbol:
-            return "No stock symbol provided."
-        price_history = fetch_history(symbol, data_source, '1y', api_key, polygon_api_key, offline_mode=offline_mode)
-        if price_history is None or price_history.empty:
-            return "Error: Unable to retrieve history."
-        techs = compute_technical_indicators(price_history)
-        signals = compute_signals(price_history, techs)
-        news_summary = ""
-        if news_sentiment and api_key:
-            news_score, news_err = fetch_news_sentiment(symbol, api_key)
-            if news_err:
-                news_summary = f"News sentiment unavailable: {news_err}"
-            else:
-                news_summary = f"News sentiment score: {round(news_score,2)}"
-                signals['news_positive'] = news_score > 0.1
-        else:
-            news_summary = "News sentiment not used (unchecked)."
-        bullish = (signals['above_ma20'] and signals['macd_cross'] and signals['rsi_status'] != "overbought")
-        direction = "call" if bullish else "put"
-        underlying_price = fetch_current_price(symbol, data_source, api_key, polygon_api_key, offline_mode=offline_mode)
-        options_chains = {}
-        expirations = fetch_options_chain(symbol, data_source, offline_mode=offline_mode)
-        if data_source == "Yahoo Finance (default)" and expirations:
-            from datetime import timedelta
-            today = datetime.today().date()
-            cutoff_date = today + timedelta(days=45)
-            sorted_dates = sorted(datetime.strptime(date, "%Y-%m-%d").date() for date in expirations)
-            exp_dates = [d.strftime("%Y-%m-%d") for d in sorted_dates if d <= cutoff_date]
-            for exp_date in exp_dates:
-                chain = fetch_option_chain_data(symbol, exp_date, data_source, offline_mode=offline_mode)
-                options_chains[exp_date] = chain
-        return {
-            "signals": signals,
-            "techs": techs,
-            "options_chains": options_chains,
-            "underlying_price": underlying_price,
-            "direction": direction,
-            "news_summary": news_summary,
-            "price_history": price_history,
-            "ticker": symbol,
-            "provider": data_source
-        }
-    except Exception as e:
-        return f'Error occurred processing: {str(e)}'
+from metrics import REGISTRY, trace, profile
 
 def main_gui():
     main_layout = [
@@ -137,6 +83,7 @@ def main_gui():
                     f"MACD: {'Bullish' if signals['macd_cross'] else 'Bearish'}",
                     f"Bollinger Bands: {signals['bollinger'].capitalize()}",
                     f"Volume: {'Spike' if signals['volume_spike'] else 'Normal'}",
+                    f"Volatility: {result['volatility']['sigma']:.1%} ({result['volatility']['regime']} regime)",
                     f"Direction: {'CALL (Bullish)' if direction == 'call' else 'PUT (Bearish)'}",
                     f"{news_summary}"
                 ]
@@ -163,10 +110,15 @@ def main_gui():
                 else:
                     capital = 0
                 top3_contracts = []
+                timing_text = result['timings'].format()
                 if show_options:
-                    top3_contracts = find_best_options(
-                        options_chains, underlying_price, direction, capital, top_n=3
-                    )
+                    with trace("ranking") as rank_trace:
+                        top3_contracts = find_best_options(
+                            options_chains, underlying_price, direction, capital, top_n=3,
+                            target_iv=result['volatility']['sigma']
+                        )
+                    timing_text += "\n" + rank_trace.format()
+                REGISTRY.write(METRICS_PATH)
                 log_info = {
                     'entry_timestamp': str(datetime.now()),
                     'exit_timestamp': '',
@@ -203,7 +155,7 @@ def main_gui():
                     option_summary.append([sg.Text("Options recommendations only available with Yahoo Finance!", text_color="#800000")])
                 result_layout += [[sg.HorizontalSeparator()]] + option_summary
                 result_layout += [
-                    [sg.Button("Show Chart/Explanation"), sg.Button("OK")]
+                    [sg.Button("Show Chart/Explanation"), sg.Button("Show Timings"), sg.Button("OK")]
                 ]
                 result_window = sg.Window("Recommendation", result_layout, modal=True, finalize=True, size=(540, 600))
                 while True:
@@ -220,11 +172,47 @@ def main_gui():
                             window=120,
                             provider=provider
                         )
+                    elif event_result == "Show Timings":
+                        sg.popup_scrolled(timing_text, title="Timing Breakdown", font=("Courier", 10), size=(70, 25))
                 result_window.close()
     window.close()
 
 def gui():
     main_gui()
 
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="Options trade recommendation (no arguments opens the GUI).")
+    parser.add_argument("symbol", nargs="?", help="Stock symbol, e.g. NVDA")
+    parser.add_argument("--source", default="Yahoo Finance (default)", choices=["Yahoo Finance (default)", "Alpha Vantage", "Polygon.io"])
+    parser.add_argument("--offline", action="store_true", help="Use the training_dataset CSVs")
+    parser.add_argument("--capital", type=float, default=0, help="Capital for option ranking")
+    parser.add_argument("--profile", choices=["cprofile", "pyinstrument"], help="Capture a profile of the request")
+    parser.add_argument("--profile-output", default=None, help="Where to write the profile (.prof, .txt or .html)")
+    parser.add_argument("--metrics", default=METRICS_PATH, help="Metrics export path (.prom for Prometheus text, else JSON)")
+    args = parser.parse_args(argv)
+    if not args.symbol:
+        return gui()
+    with ExitStack() as stack:
+        if args.profile:
+            stack.enter_context(profile(args.profile, args.profile_output))
+        result = compute_recommendation(args.symbol, args.source, api_key=DEFAULT_ALPHA_VANTAGE_KEY,
+                                        polygon_api_key=DEFAULT_POLYGON_KEY, offline_mode=args.offline)
+        if isinstance(result, str):
+            print(result)
+            REGISTRY.write(args.metrics)
+            return
+        print(f"{result['ticker']}: {result['direction'].upper()}  signals={result['signals']}")
+        print(f"Volatility: {result['volatility']['sigma']:.1%} ({result['volatility']['regime']} regime)")
+        print(result['timings'].format())
+        if args.capital and result['options_chains']:
+            with trace("ranking") as rank_trace:
+                top = find_best_options(result['options_chains'], result['underlying_price'], result['direction'], args.capital, top_n=3,
+                                        target_iv=result['volatility']['sigma'])
+            for idx, rec in enumerate(top):
+                opt = rec['option']
+                print(f"#{idx+1} Buy {rec['num_contracts']} {opt['expiry']} {opt['strike']}$ {opt['type'].upper()}s @ ${opt['ask']:.2f}")
+            print(rank_trace.format())
+    REGISTRY.write(args.metrics)
+
 if __name__ == "__main__":
-    gui()
\ No newline at end of file
+    cli()
\ No newline at end of file
@@ -0,0 +1,189 @@
+# metrics.py
+
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Process-wide timing/counter registry plus an optional per-request trace.
+# span()/timed() feed both: the registry accumulates totals for export
+# (JSON or Prometheus text), the trace keeps one request's breakdown for display.
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings = defaultdict(lambda: {'count': 0, 'sum': 0.0, 'max': 0.0})
+        self.counters = defaultdict(float)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            t = self.timings[name]
+            t['count'] += 1
+            t['sum'] += seconds
+            t['max'] = max(t['max'], seconds)
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'timings': {name: dict(t) for name, t in self.timings.items()},
+                'counters': dict(self.counters),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.timings.clear()
+            self.counters.clear()
+
+    def to_prometheus(self, prefix="quant"):
+        snap = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent per pipeline stage.",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for name, t in sorted(snap['timings'].items()):
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {t["sum"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {t["count"]}')
+        for name, value in sorted(snap['counters'].items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        # Prometheus text for *.prom / *.txt, JSON otherwise.
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w') as f:
+            if path.endswith((".prom", ".txt")):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.snapshot(), f, indent=2)
+        return path
+
+REGISTRY = MetricsRegistry()
+_local = threading.local()
+
+class RequestTrace:
+    def __init__(self, name):
+        self.name = name
+        self.spans = []
+        self.counters = defaultdict(float)
+        self.error = None
+        self.depth = 0
+        self.started = time.perf_counter()
+        self.seconds = None
+
+    def breakdown(self):
+        # [(name, depth, calls, seconds)] in start order (parents before their children),
+        # repeated spans summed.
+        rows = {}
+        for name, depth, seconds in self.spans:
+            row = rows.setdefault(name, [name, depth, 0, 0.0])
+            row[2] += 1
+            row[3] += seconds
+        return [tuple(r) for r in rows.values()]
+
+    def format(self):
+        total = self.seconds if self.seconds is not None else time.perf_counter() - self.started
+        lines = [f"{self.name}: {total * 1000:.1f} ms total"]
+        for name, depth, calls, seconds in self.breakdown():
+            count = f" x{calls}" if calls > 1 else ""
+            lines.append(f"{'  ' * (depth + 1)}{name}{count}: {seconds * 1000:.1f} ms")
+        for name, value in self.counters.items():
+            lines.append(f"  {name}: {value:g}")
+        if self.error:
+            lines.append(f"  error: {self.error}")
+        return "\n".join(lines)
+
+def current_trace():
+    return getattr(_local, 'trace', None)
+
+@contextmanager
+def trace(name):
+    previous = current_trace()
+    t = RequestTrace(name)
+    _local.trace = t
+    try:
+        yield t
+    finally:
+        t.seconds = time.perf_counter() - t.started
+        REGISTRY.observe(name, t.seconds)
+        if t.error:
+            REGISTRY.incr("errors")
+        _local.trace = previous
+
+@contextmanager
+def span(name):
+    t = current_trace()
+    entry = None
+    if t is not None:
+        # Recorded on entry so the trace lists spans in the order they started.
+        entry = [name, t.depth, 0.0]
+        t.spans.append(entry)
+        t.depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        if t is None:
+            REGISTRY.incr("errors")
+        elif t.error is None:
+            t.error = f"{name}: {type(e).__name__}: {e}"
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        REGISTRY.observe(name, seconds)
+        if t is not None:
+            t.depth -= 1
+            entry[2] = seconds
+
+def timed(name=None):
+    def decorator(func):
+        label = name or func.__name__
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def incr(name, value=1):
+    REGISTRY.incr(name, value)
+    t = current_trace()
+    if t is not None:
+        t.counters[name] += value
+
+@contextmanager
+def profile(mode="cprofile", output=None):
+    # Capture a profile of the enclosed block; pyinstrument is optional.
+    if mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ImportError("pyinstrument is not installed (pip install pyinstrument)")
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            if output:
+                with open(output, 'w') as f:
+                    f.write(profiler.output_html() if output.endswith(".html") else profiler.output_text())
+    elif mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            if output:
+                profiler.dump_stats(output)
+    else:
+        raise ValueError(f"Unknown profile mode: {mode}")
@@ -0,0 +1,39 @@
+# montecarlo.py
+
+import numpy as np
+from scipy.special import ndtr
+
+# Geometric Brownian motion helpers from the deep-learning notebook, as an
+# importable module. Paths are generated in one cumsum over a (n_sims, n_days)
+# shock matrix instead of a per-day Python loop.
+
+def estimate_drift_vol(price_series, sigma=None):
+    # Pass a current sigma (e.g. volatility_features(...)[1]['sigma']) to replace
+    # the whole-sample std with a regime-aware estimate.
+    log_returns = np.log(price_series / price_series.shift(1)).dropna()
+    mu = log_returns.mean() * 252
+    if sigma is None:
+        sigma = log_returns.std() * np.sqrt(252)
+    return mu, sigma
+
+def simulate_price_paths(last_price, mu, sigma, n_days=10, n_sims=1000, seed=None):
+    dt = 1/252
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal((n_sims, n_days - 1))
+    log_steps = (mu - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * shocks
+    paths = np.empty((n_sims, n_days))
+    paths[:, 0] = last_price
+    paths[:, 1:] = last_price * np.exp(np.cumsum(log_steps, axis=1))
+    return paths
+
+def bs_price(spot, strike, t, sigma, is_call, r=0.0):
+    # t is in years of 252 sessions, the same basis the sigmas here are annualized on.
+    intrinsic = np.where(is_call, np.maximum(spot - strike, 0), np.maximum(strike - spot, 0))
+    t_safe = np.maximum(t, 1e-8)
+    vol_t = sigma * np.sqrt(t_safe)
+    d1 = (np.log(spot / strike) + (r + 0.5 * sigma ** 2) * t_safe) / vol_t
+    d2 = d1 - vol_t
+    discount = strike * np.exp(-r * t_safe)
+    call = spot * ndtr(d1) - discount * ndtr(d2)
+    put = call - spot + discount
+    return np.where(t <= 0, intrinsic, np.where(is_call, call, put))
@@ -3,8 +3,15 @@
 import numpy as np
 from datetime import datetime
 import math
+from metrics import timed
 
-def find_best_options(options_chains, underlying_price, direction, capital, top_n=3, alpha=1.0, beta=0.5, gamma=0.01, delta=0.01, epsilon=1.0):
+@timed()
+def find_best_options(options_chains, underlying_price, direction, capital, top_n=3, alpha=1.0, beta=0.5, gamma=0.01, delta=0.01, epsilon=1.0, target_iv=None):
+    # target_iv: IV the beta term pulls towards; defaults to 0.5, or pass the current
+    # realized/forecast sigma so contracts priced near the vol regime rank higher.
+    if target_iv is not None and np.isnan(target_iv):
+        target_iv = None
+    iv_anchor = 0.5 if target_iv is None else target_iv
     ranked = []
     for exp_date, chain in options_chains.items():
         calls = chain.calls if direction == "call" else chain.puts
@@ -19,7 +26,7 @@ def find_best_options(options_chains, underlying_price, direction, capital, top_
                 continue
             moneyness = abs(strike - underlying_price)
             days_to_expiry = (datetime.strptime(exp_date, "%Y-%m-%d").date() - datetime.today().date()).days
-            score = -alpha*moneyness - beta*abs(iv - 0.5) + gamma*open_interest + delta*volume
+            score = -alpha*moneyness - beta*abs(iv - iv_anchor) + gamma*open_interest + delta*volume
             if 20 < days_to_expiry < 55:
                 score += epsilon
             ranked.append((score, {
@@ -31,7 +38,8 @@ def find_best_options(options_chains, underlying_price, direction, capital, top_
                     "iv": iv,
                     "open_interest": open_interest,
                     "volume": volume,
-                    "days_to_expiry": days_to_expiry
+                    "days_to_expiry": days_to_expiry,
+                    "iv_rv_spread": iv - target_iv if target_iv is not None else None
                 }
             ))
     ranked.sort(reverse=True, key=lambda x: x[0])
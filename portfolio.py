@@ -0,0 +1,205 @@
+# portfolio.py
+
+import os
+import numpy as np
+import pandas as pd
+
+from datasource import fetch_history_offline, TRAINING_DATA_PATH
+from montecarlo import bs_price
+from trading_calendar import get_trading_calendar
+
+# Portfolio-level option backtest. All symbols trade out of one cash pool; open
+# positions live in a preallocated array book (one slot per position) and each
+# session is a handful of vectorized NumPy ops over that book, so the event loop
+# cost is O(sessions), not O(sessions x trades x dict lookups).
+#
+# Options are marked with Black-Scholes off the underlying close and a rolling
+# realized vol; bid/ask are mid -/+ half the quoted spread, fills happen at the
+# far side (buy at ask, sell at bid) and commission is charged per contract.
+
+def load_universe(symbols, start=None, end=None):
+    # Aligned session x symbol close matrix from the offline CSVs.
+    closes = {}
+    for symbol in symbols:
+        df = fetch_history_offline(symbol)
+        if df.empty:
+            continue
+        index = pd.to_datetime(df.index, utc=True).tz_convert('America/New_York').normalize().tz_localize(None)
+        closes[symbol] = pd.Series(df['Close'].values, index=index)
+    closes = pd.DataFrame(closes).sort_index()
+    if start is not None:
+        closes = closes[closes.index >= pd.Timestamp(start)]
+    if end is not None:
+        closes = closes[closes.index <= pd.Timestamp(end)]
+    return closes
+
+def signal_matrix(closes):
+    # compute_recommendation's rule for every session at once: +1 call, -1 put.
+    sma20 = closes.rolling(20).mean()
+    delta = closes.diff()
+    avg_gain = delta.clip(lower=0).rolling(14).mean()
+    avg_loss = (-delta.clip(upper=0)).rolling(14).mean()
+    rsi = (100 - 100 / (1 + avg_gain / avg_loss)).where(avg_loss != 0, 50)
+    macd = closes.ewm(span=12, adjust=False).mean() - closes.ewm(span=26, adjust=False).mean()
+    macd_signal = closes.ewm(span=9, adjust=False).mean()
+    bullish = (closes > sma20) & (macd > macd_signal) & (rsi <= 70)
+    directions = pd.DataFrame(np.where(bullish, 1, -1), index=closes.index, columns=closes.columns)
+    return directions.where(sma20.notna(), 0)
+
+def realized_sigma(closes, window=20, floor=0.05):
+    log_ret = np.log(closes / closes.shift(1))
+    return (log_ret.rolling(window).std() * np.sqrt(252)).clip(lower=floor)
+
+def _years_between(sessions, start, end):
+    # Sessions in (start, end] over 252, the convention bs_price and realized_sigma use.
+    return (np.searchsorted(sessions, end, side='right') - np.searchsorted(sessions, start, side='right')) / 252.0
+
+class PositionBook:
+    FIELDS = {
+        'symbol': np.int32, 'is_call': bool, 'strike': float, 'expiry': 'datetime64[D]',
+        'entry_day': np.int64, 'qty': np.int64, 'entry_price': float, 'open': bool,
+    }
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.arrays = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.FIELDS.items()}
+
+    def __getattr__(self, name):
+        arrays = self.__dict__.get('arrays')
+        if arrays is not None and name in arrays:
+            return arrays[name]
+        raise AttributeError(name)
+
+    def open_slots(self):
+        return np.flatnonzero(self.arrays['open'])
+
+    def add(self, **columns):
+        n = len(columns['symbol'])
+        free = np.flatnonzero(~self.arrays['open'])
+        if len(free) < n:
+            grow = max(self.capacity, n - len(free))
+            for name, dtype in self.FIELDS.items():
+                self.arrays[name] = np.concatenate([self.arrays[name], np.zeros(grow, dtype=dtype)])
+            self.capacity += grow
+            free = np.flatnonzero(~self.arrays['open'])
+        slots = free[:n]
+        for name, values in columns.items():
+            self.arrays[name][slots] = values
+        self.arrays['open'][slots] = True
+        return slots
+
+def run_portfolio_backtest(closes, directions=None, sigmas=None, initial_capital=100000.0,
+                           position_pct=0.05, max_positions=20, max_per_symbol=1, hold_days=10,
+                           dte_days=30, strike_step=1.0, spread_pct=0.05, commission=0.65,
+                           take_profit=None, stop_loss=None, r=0.0):
+    closes = closes.ffill()
+    directions = signal_matrix(closes) if directions is None else directions.reindex_like(closes).fillna(0)
+    sigmas = realized_sigma(closes) if sigmas is None else sigmas.reindex_like(closes).ffill()
+    symbols = np.array(closes.columns)
+    dates = closes.index.values.astype('datetime64[D]')
+    px = closes.to_numpy(dtype=float)
+    sig = sigmas.to_numpy(dtype=float)
+    dirs = directions.to_numpy(dtype=np.int8)
+    n_days, n_symbols = px.shape
+    half_spread = spread_pct / 2
+    sessions = get_trading_calendar().sessions
+
+    book = PositionBook()
+    cash = float(initial_capital)
+    equity = np.zeros(n_days)
+    cash_curve = np.zeros(n_days)
+    open_count = np.zeros(n_days, dtype=np.int64)
+    trade_chunks = []
+
+    for d in range(n_days):
+        today = dates[d]
+        # --- mark open positions ---
+        slots = book.open_slots()
+        bids = np.zeros(0)
+        if len(slots):
+            sym = book.symbol[slots]
+            t = _years_between(sessions, today, book.expiry[slots])
+            mid = bs_price(px[d, sym], book.strike[slots], t, sig[d, sym], book.is_call[slots], r)
+            bids = np.maximum(mid * (1 - half_spread), 0.0)
+            held = d - book.entry_day[slots]
+            ret = mid / book.entry_price[slots] - 1
+            exit_mask = (held >= hold_days) | (t <= 0)
+            if take_profit is not None:
+                exit_mask |= ret >= take_profit
+            if stop_loss is not None:
+                exit_mask |= ret <= -stop_loss
+            if exit_mask.any():
+                out = slots[exit_mask]
+                qty = book.qty[out]
+                proceeds = bids[exit_mask] * 100 * qty - commission * qty
+                cash += proceeds.sum()
+                trade_chunks.append(pd.DataFrame({
+                    'symbol': symbols[book.symbol[out]],
+                    'type': np.where(book.is_call[out], 'call', 'put'),
+                    'strike': book.strike[out],
+                    'expiry': book.expiry[out],
+                    'entry_date': dates[book.entry_day[out]],
+                    'exit_date': today,
+                    'qty': qty,
+                    'entry_price': book.entry_price[out],
+                    'exit_price': bids[exit_mask],
+                    'pnl': proceeds - (book.entry_price[out] * 100 + commission) * qty,
+                }))
+                book.open[out] = False
+                slots, bids = slots[~exit_mask], bids[~exit_mask]
+        positions_value = (bids * 100 * book.qty[slots]).sum()
+
+        # --- open new positions ---
+        room = max_positions - len(slots)
+        if room > 0:
+            held_per_symbol = np.bincount(book.symbol[slots], minlength=n_symbols)
+            cand = np.flatnonzero((dirs[d] != 0) & (held_per_symbol < max_per_symbol)
+                                  & np.isfinite(px[d]) & np.isfinite(sig[d]))
+            if len(cand):
+                spot = px[d, cand]
+                is_call = dirs[d, cand] > 0
+                strike = np.maximum(np.round(spot / strike_step) * strike_step, strike_step)
+                expiry = np.full(len(cand), today + np.timedelta64(dte_days, 'D'))
+                mid = bs_price(spot, strike, _years_between(sessions, today, expiry), sig[d, cand], is_call, r)
+                ask = np.maximum(mid * (1 + half_spread), 0.01)
+                unit_cost = ask * 100 + commission
+                budget = (cash + positions_value) * position_pct
+                qty = np.floor(budget / unit_cost).astype(np.int64)
+                cost = qty * unit_cost
+                take = (qty > 0) & (np.cumsum(cost * (qty > 0)) <= cash)
+                take &= np.cumsum(take) <= room
+                if take.any():
+                    book.add(symbol=cand[take], is_call=is_call[take], strike=strike[take], expiry=expiry[take],
+                             entry_day=np.full(take.sum(), d), qty=qty[take], entry_price=ask[take])
+                    cash -= cost[take].sum()
+                    positions_value += (np.maximum(mid[take] * (1 - half_spread), 0.0) * 100 * qty[take]).sum()
+
+        cash_curve[d] = cash
+        equity[d] = cash + positions_value
+        open_count[d] = int(book.open.sum())
+
+    equity_curve = pd.DataFrame({'cash': cash_curve, 'equity': equity, 'open_positions': open_count}, index=closes.index)
+    trades = pd.concat(trade_chunks, ignore_index=True) if trade_chunks else pd.DataFrame()
+    return {'equity': equity_curve, 'trades': trades}
+
+def summarize(result):
+    equity = result['equity']['equity']
+    trades = result['trades']
+    returns = trades['pnl'] / (trades['entry_price'] * 100 * trades['qty']) if not trades.empty else pd.Series(dtype=float)
+    return {
+        'final_equity': float(equity.iloc[-1]),
+        'total_return': float(equity.iloc[-1] / equity.iloc[0] - 1),
+        'max_drawdown': float((1 - equity / equity.cummax()).max()),
+        'trades': len(trades),
+        'win_rate': float((trades['pnl'] > 0).mean()) if not trades.empty else np.nan,
+        'mean_return': float(returns.mean()) if not trades.empty else np.nan,
+    }
+
+if __name__ == "__main__":
+    symbols = sorted(f.split("_")[0] for f in os.listdir(TRAINING_DATA_PATH) if f.endswith("_historical_data.csv"))
+    closes = load_universe(symbols, start="2019-01-01")
+    result = run_portfolio_backtest(closes)
+    result['equity'].to_csv("portfolio_equity.csv")
+    result['trades'].to_csv("portfolio_trades.csv", index=False)
+    for key, value in summarize(result).items():
+        print(f"{key}: {value}")
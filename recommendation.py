@@ -0,0 +1,71 @@
+# recommendation.py
+
+import pandas as pd
+from datetime import datetime, timedelta
+
+from datasource import (
+    fetch_current_price, fetch_history, fetch_options_chain, fetch_option_chain_data, fetch_news_sentiment
+)
+from technicals import compute_technical_indicators, compute_signals
+from volatility import volatility_features
+from trading_calendar import get_trading_calendar
+from metrics import trace, span
+
+# GUI-free recommendation pipeline, shared by main.py (GUI/CLI) and service.py.
+
+def is_us_market_open(date=None):
+    date = pd.Timestamp(date or datetime.now().date())
+    return get_trading_calendar().is_open(date)
+
+def compute_recommendation(symbol, data_source, news_sentiment=False, api_key=None, polygon_api_key=None, offline_mode=False):
+    with trace("compute_recommendation") as t:
+        try:
+            symbol = symbol.strip().upper()
+            if not symbol:
+                return "No stock symbol provided."
+            price_history = fetch_history(symbol, data_source, '1y', api_key, polygon_api_key, offline_mode=offline_mode)
+            if price_history is None or price_history.empty:
+                return "Error: Unable to retrieve history."
+            techs = compute_technical_indicators(price_history)
+            signals = compute_signals(price_history, techs)
+            _, volatility = volatility_features(price_history, symbol)
+            news_summary = ""
+            if news_sentiment and api_key:
+                news_score, news_err = fetch_news_sentiment(symbol, api_key)
+                if news_err:
+                    news_summary = f"News sentiment unavailable: {news_err}"
+                else:
+                    news_summary = f"News sentiment score: {round(news_score,2)}"
+                    signals['news_positive'] = news_score > 0.1
+            else:
+                news_summary = "News sentiment not used (unchecked)."
+            bullish = (signals['above_ma20'] and signals['macd_cross'] and signals['rsi_status'] != "overbought")
+            direction = "call" if bullish else "put"
+            underlying_price = fetch_current_price(symbol, data_source, api_key, polygon_api_key, offline_mode=offline_mode)
+            options_chains = {}
+            expirations = fetch_options_chain(symbol, data_source, offline_mode=offline_mode)
+            if data_source == "Yahoo Finance (default)" and expirations:
+                today = datetime.today().date()
+                cutoff_date = today + timedelta(days=45)
+                sorted_dates = sorted(datetime.strptime(date, "%Y-%m-%d").date() for date in expirations)
+                exp_dates = [d.strftime("%Y-%m-%d") for d in sorted_dates if d <= cutoff_date]
+                with span("option_chain_loop"):
+                    for exp_date in exp_dates:
+                        chain = fetch_option_chain_data(symbol, exp_date, data_source, offline_mode=offline_mode)
+                        options_chains[exp_date] = chain
+            return {
+                "signals": signals,
+                "techs": techs,
+                "options_chains": options_chains,
+                "underlying_price": underlying_price,
+                "direction": direction,
+                "news_summary": news_summary,
+                "price_history": price_history,
+                "ticker": symbol,
+                "provider": data_source,
+                "volatility": volatility,
+                "timings": t
+            }
+        except Exception as e:
+            t.error = t.error or f"{type(e).__name__}: {e}"
+            return f'Error occurred processing: {t.error}'
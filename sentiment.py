@@ -0,0 +1,206 @@
+# sentiment.py
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import requests
+
+from config import NEWS_CACHE_DIR
+
+# Alpha Vantage NEWS_SENTIMENT behind a per-(ticker, day) disk cache.
+# - Past days are cached for good; today's entry is refreshed after TODAY_TTL.
+# - Identical requests in flight share one HTTP call.
+# - Calls go through a token-bucket limiter and run on a small thread pool.
+# - Historical ranges are fetched in one request per chunk and split by day.
+# Note: AV's tickers=A,B filter returns only articles mentioning *all* listed
+# tickers, so tickers are not packed into one query (it would drop articles);
+# batching is done over time instead.
+
+TODAY_TTL = timedelta(hours=1)
+AV_URL = "https://www.alphavantage.co/query"
+
+class RateLimiter:
+    def __init__(self, calls, period=60.0):
+        self.capacity = calls
+        self.period = period
+        self.tokens = float(calls)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / self.period)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * self.period / self.capacity
+            time.sleep(wait)
+
+def _day(date):
+    return pd.Timestamp(date or datetime.now()).strftime("%Y-%m-%d")
+
+def _reduce_article(article, ticker):
+    # Keep only what scoring needs: the ticker-specific score and relevance.
+    entry = next((t for t in article.get("ticker_sentiment", []) if t.get("ticker") == ticker), None)
+    return {
+        "time_published": article.get("time_published", ""),
+        "title": article.get("title", ""),
+        "overall_sentiment_score": float(article.get("overall_sentiment_score", 0) or 0),
+        "ticker_sentiment_score": float(entry["ticker_sentiment_score"]) if entry else None,
+        "relevance_score": float(entry["relevance_score"]) if entry else None,
+    }
+
+def weighted_scores(articles):
+    # Relevance-weighted mean of ticker scores; falls back to the overall score
+    # with weight 1 when an article has no ticker entry.
+    if not articles:
+        return np.nan
+    scores = np.array([a["ticker_sentiment_score"] if a["ticker_sentiment_score"] is not None else a["overall_sentiment_score"] for a in articles])
+    weights = np.array([a["relevance_score"] if a["relevance_score"] is not None else 1.0 for a in articles])
+    if weights.sum() <= 0:
+        return float(scores.mean())
+    return float(np.dot(scores, weights) / weights.sum())
+
+class SentimentService:
+    def __init__(self, api_key, cache_dir=NEWS_CACHE_DIR, calls_per_minute=5, max_workers=4, http_get=requests.get):
+        self.api_key = api_key
+        self.cache_dir = cache_dir
+        self.limiter = RateLimiter(calls_per_minute)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.http_get = http_get
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    # --- cache ---
+    def _cache_path(self, ticker, day):
+        return os.path.join(self.cache_dir, ticker, f"{day}.json")
+
+    def _load(self, ticker, day):
+        fn = self._cache_path(ticker, day)
+        if not os.path.exists(fn):
+            return None
+        with open(fn) as f:
+            entry = json.load(f)
+        if day == _day(None) and datetime.now() - datetime.fromisoformat(entry["fetched_at"]) > TODAY_TTL:
+            return None
+        return entry["articles"]
+
+    def _save(self, ticker, day, articles):
+        fn = self._cache_path(ticker, day)
+        os.makedirs(os.path.dirname(fn), exist_ok=True)
+        with open(fn, 'w') as f:
+            json.dump({"fetched_at": datetime.now().isoformat(), "articles": articles}, f)
+
+    # --- network ---
+    def _query(self, ticker, time_from, time_to, limit):
+        self.limiter.acquire()
+        resp = self.http_get(AV_URL, params={
+            "function": "NEWS_SENTIMENT", "tickers": ticker, "time_from": time_from,
+            "time_to": time_to, "limit": limit, "sort": "LATEST", "apikey": self.api_key,
+        }, timeout=10)
+        data = resp.json()
+        if "feed" not in data:
+            # Rate-limit / error payloads come back as Note or Information
+            raise RuntimeError(data.get("Note") or data.get("Information") or data.get("Error Message") or "No news found.")
+        return [_reduce_article(a, ticker) for a in data["feed"]]
+
+    def _fetch_day(self, ticker, day, limit):
+        start = pd.Timestamp(day)
+        articles = self._query(ticker, start.strftime("%Y%m%dT0000"), (start + pd.Timedelta(days=1)).strftime("%Y%m%dT0000"), limit)
+        self._save(ticker, day, articles)
+        return articles
+
+    def _articles_future(self, ticker, day, limit):
+        cached = self._load(ticker, day)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+        key = (ticker, day)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self.executor.submit(self._fetch_day, ticker, day, limit)
+                self._inflight[key] = future
+                future.add_done_callback(lambda _, key=key: self._forget(key))
+        return future
+
+    def articles(self, ticker, date=None, limit=50):
+        return self._articles_future(ticker.upper(), _day(date), limit).result()
+
+    def _forget(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    # --- scores ---
+    @staticmethod
+    def _score_from(future):
+        try:
+            articles = future.result()
+        except Exception as e:
+            return None, str(e)
+        if not articles:
+            return None, "No news found."
+        return weighted_scores(articles), None
+
+    def score(self, ticker, date=None, limit=50):
+        # Same (score, error) contract as datasource.fetch_news_sentiment.
+        return self._score_from(self._articles_future(ticker.upper(), _day(date), limit))
+
+    def scores(self, tickers, date=None, limit=50):
+        # Uncached tickers are fetched concurrently (still within the rate limit).
+        day = _day(date)
+        futures = {t: self._articles_future(t, day, limit) for t in dict.fromkeys(t.upper() for t in tickers)}
+        return {t: self._score_from(f) for t, f in futures.items()}
+
+    def daily_series(self, ticker, start, end, chunk_days=30, limit=1000):
+        # Daily relevance-weighted score indexed by date (NaN on days without news).
+        ticker = ticker.upper()
+        days = pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq="D")
+        missing = [d for d in days if self._load(ticker, d.strftime("%Y-%m-%d")) is None]
+        while missing:
+            chunk_end = missing[-1]
+            chunk_start = max(missing[0], chunk_end - pd.Timedelta(days=chunk_days - 1))
+            articles = self._query(ticker, chunk_start.strftime("%Y%m%dT0000"),
+                                   (chunk_end + pd.Timedelta(days=1)).strftime("%Y%m%dT0000"), limit)
+            by_day = {}
+            for a in articles:
+                by_day.setdefault(f"{a['time_published'][:4]}-{a['time_published'][4:6]}-{a['time_published'][6:8]}", []).append(a)
+            # A full page may be truncated at its oldest end; leave that day (and earlier) for the next query.
+            complete_from = chunk_start
+            if len(articles) >= limit and by_day:
+                complete_from = pd.Timestamp(min(by_day)) + pd.Timedelta(days=1)
+            for d in [d for d in missing if complete_from <= d <= chunk_end]:
+                key = d.strftime("%Y-%m-%d")
+                self._save(ticker, key, by_day.get(key, []))
+            remaining = [d for d in missing if d < complete_from]
+            if len(remaining) == len(missing):
+                break
+            missing = remaining
+        rows = []
+        for d in days:
+            for a in self._load(ticker, d.strftime("%Y-%m-%d")) or []:
+                rows.append((d, a["ticker_sentiment_score"], a["overall_sentiment_score"], a["relevance_score"]))
+        series = pd.Series(np.nan, index=days, name=f"{ticker}_sentiment")
+        if rows:
+            df = pd.DataFrame(rows, columns=["date", "ticker_score", "overall", "relevance"])
+            score = df["ticker_score"].fillna(df["overall"])
+            weight = df["relevance"].fillna(1.0)
+            grouped = pd.DataFrame({"date": df["date"], "ws": score * weight, "w": weight}).groupby("date").sum()
+            series.loc[grouped.index] = (grouped["ws"] / grouped["w"].where(grouped["w"] > 0)).values
+        return series
+
+_services = {}
+
+def get_sentiment_service(api_key, http_get=requests.get):
+    if api_key not in _services:
+        _services[api_key] = SentimentService(api_key, http_get=http_get)
+    return _services[api_key]
@@ -0,0 +1,314 @@
+# service.py
+
+import argparse
+import asyncio
+import functools
+import io
+import json
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qsl
+import numpy as np
+import pandas as pd
+
+from config import DEFAULT_ALPHA_VANTAGE_KEY, DEFAULT_POLYGON_KEY
+from recommendation import compute_recommendation
+from options import find_best_options
+from strategies import find_best_strategies
+from plotting import ChartRenderer
+
+# Local HTTP/JSON front end for the recommendation pipeline, on plain asyncio
+# streams (no web framework). Blocking work runs on a thread pool; concurrent
+# requests for the same key share one in-flight computation and finished results
+# are served from a short-TTL cache.
+#
+#     python service.py --offline --port 8765
+#     GET /recommendation?symbol=NVDA
+#     GET /rank?symbol=NVDA&capital=2000&top_n=3
+#     GET /strategies?symbol=SPY&capital=2000&top_n=5
+#     GET /chart?symbol=NVDA&format=svg
+#     GET /stats
+
+DEFAULT_SOURCE = "Yahoo Finance (default)"
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 422: "Unprocessable Entity", 500: "Internal Server Error"}
+
+def _jsonable(obj):
+    if isinstance(obj, dict):
+        return {str(k): _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    if isinstance(obj, (pd.Timestamp, np.datetime64)):
+        return str(obj)
+    return obj
+
+def recommendation_payload(result):
+    techs = {k: v for k, v in result['techs'].items() if isinstance(v, (int, float, str, np.number))}
+    techs['fib_levels'] = result['techs']['fib']['levels']
+    trace = result['timings']
+    return _jsonable({
+        'ticker': result['ticker'],
+        'provider': result['provider'],
+        'direction': result['direction'],
+        'underlying_price': result['underlying_price'],
+        'signals': result['signals'],
+        'techs': techs,
+        'volatility': result['volatility'],
+        'news_summary': result['news_summary'],
+        'expirations': list(result['options_chains']),
+        'timings': {
+            'total_ms': trace.seconds * 1000,
+            'stages': [{'name': n, 'calls': c, 'ms': sec * 1000} for n, _, c, sec in trace.breakdown()],
+            'counters': dict(trace.counters),
+        },
+    })
+
+class ServiceStats:
+    def __init__(self, window=1000):
+        self.started = time.time()
+        self.requests = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.latencies = defaultdict(lambda: deque(maxlen=window))
+        self.recent = deque()
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.computations = 0
+
+    def record(self, route, status, seconds):
+        now = time.time()
+        self.requests[route] += 1
+        if status >= 400:
+            self.errors[route] += 1
+        self.latencies[route].append(seconds)
+        self.recent.append(now)
+        while self.recent and self.recent[0] < now - 60:
+            self.recent.popleft()
+
+    def snapshot(self):
+        uptime = time.time() - self.started
+        routes = {}
+        for route, samples in self.latencies.items():
+            ms = np.array(samples) * 1000
+            routes[route] = {
+                'requests': self.requests[route],
+                'errors': self.errors[route],
+                'p50_ms': float(np.percentile(ms, 50)),
+                'p95_ms': float(np.percentile(ms, 95)),
+                'max_ms': float(ms.max()),
+            }
+        total = sum(self.requests.values())
+        return {
+            'uptime_s': uptime,
+            'requests': total,
+            'throughput_rps': total / uptime if uptime else 0.0,
+            'last_minute_rps': len(self.recent) / 60.0,
+            'computations': self.computations,
+            'coalesced': self.coalesced,
+            'cache_hits': self.cache_hits,
+            'routes': routes,
+        }
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class RecommendationService:
+    def __init__(self, offline_mode=False, data_source=DEFAULT_SOURCE, ttl=30.0, max_workers=4,
+                 api_key=DEFAULT_ALPHA_VANTAGE_KEY, polygon_api_key=DEFAULT_POLYGON_KEY):
+        self.offline_mode = offline_mode
+        self.data_source = data_source
+        self.ttl = ttl
+        self.api_key = api_key
+        self.polygon_api_key = polygon_api_key
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.stats = ServiceStats()
+        self._cache = {}
+        self._inflight = {}
+        self._renderer = ChartRenderer()
+        self._render_lock = threading.Lock()
+        self.routes = {
+            '/recommendation': self.recommendation,
+            '/rank': self.rank,
+            '/strategies': self.strategies,
+            '/chart': self.chart,
+            '/stats': self.stats_route,
+            '/health': self.health,
+        }
+
+    # --- coalescing + TTL cache ---
+    async def cached(self, key, func, *args, **kwargs):
+        # Returns (value, computed_at); dependent results key on (key, computed_at) so they
+        # can never outlive or be confused with the value they were derived from.
+        hit = self._cache.get(key)
+        if hit is not None and hit[0] > time.monotonic():
+            self.stats.cache_hits += 1
+            return hit[1], hit[2]
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats.computations += 1
+            task = asyncio.ensure_future(self._compute(key, functools.partial(func, *args, **kwargs)))
+            self._inflight[key] = task
+        else:
+            self.stats.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _compute(self, key, call):
+        try:
+            value = await asyncio.get_running_loop().run_in_executor(self.executor, call)
+            computed_at = time.time()
+            if not isinstance(value, str):  # error strings are not cached
+                now = time.monotonic()
+                self._prune(now)
+                self._cache[key] = (now + self.ttl, value, computed_at)
+            return value, computed_at
+        finally:
+            self._inflight.pop(key, None)
+
+    def _prune(self, now):
+        for key in [k for k, entry in self._cache.items() if entry[0] <= now]:
+            del self._cache[key]
+
+    # --- helpers ---
+    def _options(self, params):
+        symbol = params.get('symbol', '').strip().upper()
+        if not symbol:
+            raise RequestError(400, "symbol is required")
+        source = params.get('source', self.data_source)
+        offline = params.get('offline', '1' if self.offline_mode else '0') in ('1', 'true', 'yes')
+        news = params.get('news', '0') in ('1', 'true', 'yes')
+        return symbol, source, offline, news
+
+    async def _recommendation(self, params):
+        # Returns the result plus a key that identifies this exact computation of it.
+        symbol, source, offline, news = self._options(params)
+        key = ('recommendation', symbol, source, offline, news)
+        result, computed_at = await self.cached(key, compute_recommendation, symbol, source, news, self.api_key,
+                                                self.polygon_api_key, offline_mode=offline)
+        if isinstance(result, str):
+            raise RequestError(422, result)
+        return result, (key, computed_at)
+
+    @staticmethod
+    def _number(params, name, default, cast=float):
+        try:
+            return cast(params.get(name, default))
+        except ValueError:
+            raise RequestError(400, f"{name} must be a number")
+
+    # --- routes ---
+    async def recommendation(self, params):
+        result, (_, computed_at) = await self._recommendation(params)
+        payload = recommendation_payload(result)
+        payload['computed_at'] = computed_at
+        return 'application/json', payload
+
+    async def rank(self, params):
+        result, source = await self._recommendation(params)
+        capital = self._number(params, 'capital', 1000)
+        top_n = self._number(params, 'top_n', 3, int)
+        ranked, _ = await self.cached(('rank', source, capital, top_n), find_best_options, result['options_chains'],
+                                      result['underlying_price'], result['direction'], capital, top_n=top_n,
+                                      target_iv=result['volatility']['sigma'])
+        return 'application/json', _jsonable({'ticker': result['ticker'], 'direction': result['direction'], 'contracts': ranked})
+
+    async def strategies(self, params):
+        result, source = await self._recommendation(params)
+        capital = self._number(params, 'capital', 1000)
+        top_n = self._number(params, 'top_n', 5, int)
+        found, _ = await self.cached(('strategies', source, capital, top_n), find_best_strategies,
+                                     result['options_chains'], result['underlying_price'], capital,
+                                     result['volatility']['sigma'], top_n=top_n)
+        return 'application/json', _jsonable({'ticker': result['ticker'], 'strategies': found})
+
+    def _render(self, result, fmt):
+        with self._render_lock:
+            self._renderer.render(result['price_history'], result['signals'], result['direction'],
+                                  result['ticker'], provider=result['provider'])
+            buf = io.BytesIO()
+            self._renderer.save(buf, fmt=fmt)
+        return buf.getvalue()
+
+    async def chart(self, params):
+        fmt = params.get('format', 'png').lower()
+        if fmt not in ('png', 'svg'):
+            raise RequestError(400, "format must be png or svg")
+        result, source = await self._recommendation(params)
+        body, _ = await self.cached(('chart', source, fmt), self._render, result, fmt)
+        return ('image/svg+xml' if fmt == 'svg' else 'image/png'), body
+
+    async def stats_route(self, params):
+        return 'application/json', self.stats.snapshot()
+
+    async def health(self, params):
+        return 'application/json', {'status': 'ok', 'offline_mode': self.offline_mode}
+
+    # --- HTTP ---
+    async def handle(self, reader, writer):
+        start = time.perf_counter()
+        route = "?"
+        try:
+            request_line = (await reader.readline()).decode('latin-1').strip()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass  # headers are not needed; bodies are not accepted
+            parts = request_line.split()
+            if len(parts) < 2:
+                return
+            method, target = parts[0], parts[1]
+            url = urlsplit(target)
+            route = url.path
+            try:
+                if method != 'GET':
+                    raise RequestError(400, "only GET is supported")
+                handler = self.routes.get(url.path)
+                if handler is None:
+                    raise RequestError(404, f"unknown path {url.path}")
+                content_type, body = await handler(dict(parse_qsl(url.query)))
+                status = 200
+            except RequestError as e:
+                status, content_type, body = e.status, 'application/json', {'error': str(e)}
+            except Exception as e:
+                status, content_type, body = 500, 'application/json', {'error': f"{type(e).__name__}: {e}"}
+            if not isinstance(body, bytes):
+                body = json.dumps(body, default=str).encode()
+            head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                    f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n")
+            writer.write(head.encode('latin-1') + body)
+            await writer.drain()
+            self.stats.record(route, status, time.perf_counter() - start)
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8765):
+        # Port 0 picks a free port; read it back from server.sockets[0].getsockname().
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        server = await self.start(host, port)
+        print(f"Serving on http://{host}:{server.sockets[0].getsockname()[1]} (offline_mode={self.offline_mode})")
+        async with server:
+            await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON recommendation service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--offline", action="store_true", help="Serve from the training_dataset CSVs")
+    parser.add_argument("--source", default=DEFAULT_SOURCE)
+    parser.add_argument("--ttl", type=float, default=30.0, help="Seconds a finished result is reused")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+    service = RecommendationService(args.offline, args.source, args.ttl, args.workers)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# shared_store.py
+
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+from datasource import fetch_history_offline
+from snapshots import Chain
+
+# OHLCV histories and option-chain snapshots packed once into flat NumPy blocks
+# that live in multiprocessing.shared_memory (or .npy memmaps on disk). A small,
+# picklable handle carries the block names and the symbol -> (offset, length)
+# index; workers attach to it and read zero-copy views instead of re-reading
+# CSVs or receiving pickled DataFrames.
+#
+#     with SharedMarketData.create(symbols) as store:
+#         with Pool(8, initializer=init_worker, initargs=(store.handle,)) as pool:
+#             pool.map(job, symbols)          # job() calls worker_store().history(sym)
+#
+# A store reopened with from_memmap(dir) hands workers the directory instead, and
+# they map the same .npy files read-only.
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+CHAIN_COLUMNS = ['strike', 'lastPrice', 'bid', 'ask', 'volume', 'openInterest', 'impliedVolatility']
+
+_worker_store = None
+
+def _chain_block(df):
+    return df.reindex(columns=CHAIN_COLUMNS).to_numpy(dtype=float)
+
+def _open_segment(name, owner_pid):
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    shm = SharedMemory(name=name)
+    # Attaching registers the segment with this process's resource tracker. Pool
+    # workers (fork or spawn) share the owner's tracker, so the entry is the owner's
+    # own and must stay; any other process has its own tracker, which would unlink
+    # the segment on exit, so drop the registration there.
+    if owner_pid not in (os.getpid(), os.getppid()):
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+    return shm
+
+class SharedMarketData:
+    def __init__(self, arrays, index, segments=None, owner=False, owner_pid=None, directory=None):
+        self.arrays = arrays          # name -> ndarray (views onto shared memory or memmaps)
+        self.index = index            # {'history': {sym: [off, n]}, 'chains': {sym: {exp: [off, n_calls, n_puts]}}}
+        self._segments = segments or []
+        self._owner = owner
+        self._owner_pid = owner_pid if owner_pid is not None else os.getpid()
+        self._directory = directory   # set when backed by .npy memmaps
+
+    # --- building ---
+    @classmethod
+    def create(cls, symbols, chains=None, loader=fetch_history_offline):
+        # chains: optional {symbol: {expiry: chain}} (e.g. OptionSnapshotStore.chains_as_of).
+        frames, history_index, offset = [], {}, 0
+        for symbol in symbols:
+            df = loader(symbol)
+            if df is None or df.empty:
+                continue
+            frames.append(df)
+            history_index[symbol] = [offset, len(df)]
+            offset += len(df)
+        ohlcv = np.empty((offset, len(OHLCV_COLUMNS)))
+        dates = np.empty(offset, dtype=np.int64)
+        for df, (off, n) in zip(frames, history_index.values()):
+            ohlcv[off:off + n] = df.reindex(columns=OHLCV_COLUMNS).to_numpy(dtype=float)
+            dates[off:off + n] = pd.to_datetime(df.index, utc=True).tz_localize(None).values.astype('datetime64[ns]').astype(np.int64)
+
+        blocks, chain_index, offset = [], {}, 0
+        for symbol, by_expiry in (chains or {}).items():
+            for expiry, chain in by_expiry.items():
+                if chain is None:
+                    continue
+                calls, puts = _chain_block(chain.calls), _chain_block(chain.puts)
+                blocks += [calls, puts]
+                chain_index.setdefault(symbol, {})[expiry] = [offset, len(calls), len(puts)]
+                offset += len(calls) + len(puts)
+        chain_data = np.concatenate(blocks) if blocks else np.empty((0, len(CHAIN_COLUMNS)))
+
+        arrays, segments = {}, []
+        for name, data in (('ohlcv', ohlcv), ('dates', dates), ('chains', chain_data)):
+            shm = SharedMemory(create=True, size=max(data.nbytes, 1))
+            view = np.ndarray(data.shape, dtype=data.dtype, buffer=shm.buf)
+            view[...] = data
+            arrays[name] = view
+            segments.append(shm)
+        return cls(arrays, {'history': history_index, 'chains': chain_index}, segments, owner=True)
+
+    @property
+    def handle(self):
+        # Picklable description workers pass to attach().
+        if self._directory is not None:
+            return {'directory': self._directory}
+        return {
+            'segments': {name: (shm.name, arr.shape, arr.dtype.str)
+                         for name, arr, shm in zip(self.arrays, self.arrays.values(), self._segments)},
+            'index': self.index,
+            'owner_pid': self._owner_pid,
+        }
+
+    @classmethod
+    def attach(cls, handle):
+        if 'directory' in handle:
+            return cls.from_memmap(handle['directory'])
+        arrays, segments = {}, []
+        for name, (shm_name, shape, dtype) in handle['segments'].items():
+            shm = _open_segment(shm_name, handle['owner_pid'])
+            arrays[name] = np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=shm.buf)
+            segments.append(shm)
+        return cls(arrays, handle['index'], segments, owner=False, owner_pid=handle['owner_pid'])
+
+    # --- memmap persistence ---
+    def to_memmap(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name, arr in self.arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), arr)
+        with open(os.path.join(directory, "index.json"), 'w') as f:
+            json.dump(self.index, f)
+        return directory
+
+    @classmethod
+    def from_memmap(cls, directory):
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+                  for name in ('ohlcv', 'dates', 'chains')}
+        with open(os.path.join(directory, "index.json")) as f:
+            index = json.load(f)
+        return cls(arrays, index, directory=os.path.abspath(directory))
+
+    # --- reads (zero-copy views) ---
+    def symbols(self):
+        return list(self.index['history'])
+
+    def ohlcv(self, symbol):
+        off, n = self.index['history'][symbol]
+        return self.arrays['ohlcv'][off:off + n]
+
+    def history(self, symbol):
+        off, n = self.index['history'][symbol]
+        dates = pd.DatetimeIndex(self.arrays['dates'][off:off + n].view('datetime64[ns]'), tz='UTC')
+        return pd.DataFrame(self.arrays['ohlcv'][off:off + n], index=dates, columns=OHLCV_COLUMNS, copy=False)
+
+    def expiries(self, symbol):
+        return sorted(self.index['chains'].get(symbol, {}))
+
+    def chain(self, symbol, expiry):
+        off, n_calls, n_puts = self.index['chains'][symbol][expiry]
+        data = self.arrays['chains']
+        calls = pd.DataFrame(data[off:off + n_calls], columns=CHAIN_COLUMNS, copy=False)
+        puts = pd.DataFrame(data[off + n_calls:off + n_calls + n_puts], columns=CHAIN_COLUMNS, copy=False)
+        return Chain(calls, puts)
+
+    def chains(self, symbol):
+        return {expiry: self.chain(symbol, expiry) for expiry in self.expiries(symbol)}
+
+    # --- lifecycle ---
+    def close(self):
+        self.arrays = {}
+        for shm in self._segments:
+            shm.close()
+            if self._owner:
+                shm.unlink()
+        self._segments = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def init_worker(handle):
+    # Pool initializer: attach once per worker process.
+    global _worker_store
+    _worker_store = SharedMarketData.attach(handle)
+
+def worker_store():
+    return _worker_store
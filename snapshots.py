@@ -0,0 +1,132 @@
+# snapshots.py
+
+import bisect
+import csv
+import os
+from datetime import datetime
+import pandas as pd
+
+from config import OPTION_SNAPSHOT_DIR
+
+# Point-in-time option-chain store. Each fetched chain is written as one Parquet
+# file partitioned by symbol and trade date:
+#     {root}/{SYMBOL}/{YYYY-MM-DD}/{HHMMSSffffff}_{EXPIRY}.parquet
+# and appended to a per-symbol manifest ({root}/{SYMBOL}/_index.csv). The manifest
+# is loaded once into sorted per-expiry timestamp lists, so "chain as of T" is a
+# bisect rather than a directory scan.
+
+SNAPSHOT_COLUMNS = ['type', 'strike', 'lastPrice', 'bid', 'ask', 'volume', 'openInterest', 'impliedVolatility']
+INDEX_FIELDS = ['timestamp', 'expiry', 'path']
+
+_store = None
+
+def _ts(value):
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return ts
+
+class Chain:
+    def __init__(self, calls, puts):
+        self.calls = calls
+        self.puts = puts
+
+class OptionSnapshotStore:
+    def __init__(self, root=OPTION_SNAPSHOT_DIR):
+        self.root = root
+        self._index = {}
+
+    def _symbol_index(self, symbol):
+        # {expiry: (sorted timestamps in ns, matching paths)}, loaded once per symbol.
+        if symbol in self._index:
+            return self._index[symbol]
+        index = {}
+        fn = os.path.join(self.root, symbol, "_index.csv")
+        if os.path.exists(fn):
+            rows = pd.read_csv(fn, dtype={'expiry': str, 'path': str})
+            # Explicit ns: the default resolution varies across pandas versions, and every
+            # lookup compares against Timestamp.value (ns).
+            rows['ns'] = pd.to_datetime(rows['timestamp']).astype('datetime64[ns]').astype('int64')
+            rows = rows.sort_values('ns', kind='stable')
+            for expiry, group in rows.groupby('expiry', sort=False):
+                index[expiry] = (group['ns'].tolist(), group['path'].tolist())
+        self._index[symbol] = index
+        return index
+
+    def record(self, symbol, expiry, chain, timestamp=None):
+        if chain is None:
+            return None
+        ts = _ts(timestamp or datetime.now())
+        frames = []
+        for kind, df in (('call', chain.calls), ('put', chain.puts)):
+            if df is None or df.empty:
+                continue
+            df = df.assign(type=kind)
+            frames.append(df[[c for c in SNAPSHOT_COLUMNS if c in df.columns]])
+        if not frames:
+            return None
+        rel = os.path.join(ts.strftime("%Y-%m-%d"), f"{ts.strftime('%H%M%S%f')}_{expiry}.parquet")
+        path = os.path.join(self.root, symbol, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pd.concat(frames, ignore_index=True).to_parquet(path, index=False)
+
+        # Load the manifest before appending so the new row is only added once below.
+        index = self._symbol_index(symbol)
+        index_fn = os.path.join(self.root, symbol, "_index.csv")
+        file_exists = os.path.isfile(index_fn)
+        with open(index_fn, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=INDEX_FIELDS)
+            if not file_exists:
+                writer.writeheader()
+            writer.writerow({'timestamp': ts.isoformat(), 'expiry': expiry, 'path': rel})
+        stamps, paths = index.setdefault(expiry, ([], []))
+        i = bisect.bisect_right(stamps, ts.value)
+        stamps.insert(i, ts.value)
+        paths.insert(i, rel)
+        return path
+
+    def record_chains(self, symbol, options_chains, timestamp=None):
+        ts = timestamp or datetime.now()
+        return [self.record(symbol, expiry, chain, ts) for expiry, chain in options_chains.items()]
+
+    def expiries(self, symbol):
+        return sorted(self._symbol_index(symbol))
+
+    def snapshot_time(self, symbol, expiry, as_of):
+        # Timestamp of the latest snapshot at or before `as_of`, or None.
+        entry = self._symbol_index(symbol).get(expiry)
+        if not entry:
+            return None
+        i = bisect.bisect_right(entry[0], _ts(as_of).value) - 1
+        return pd.Timestamp(entry[0][i]) if i >= 0 else None
+
+    def load_chain(self, symbol, expiry, as_of, max_staleness=None):
+        entry = self._symbol_index(symbol).get(expiry)
+        if not entry:
+            return None
+        as_of = _ts(as_of)
+        i = bisect.bisect_right(entry[0], as_of.value) - 1
+        if i < 0:
+            return None
+        if max_staleness is not None and as_of - pd.Timestamp(entry[0][i]) > pd.Timedelta(max_staleness):
+            return None
+        df = pd.read_parquet(os.path.join(self.root, symbol, entry[1][i]))
+        return Chain(df[df['type'] == 'call'], df[df['type'] == 'put'])
+
+    def chains_as_of(self, symbol, as_of, max_staleness=pd.Timedelta(days=4)):
+        # {expiry: chain} for every unexpired expiry with a recent enough snapshot.
+        as_of = _ts(as_of)
+        chains = {}
+        for expiry in self.expiries(symbol):
+            if pd.Timestamp(expiry) < as_of.normalize():
+                continue
+            chain = self.load_chain(symbol, expiry, as_of, max_staleness)
+            if chain is not None:
+                chains[expiry] = chain
+        return chains
+
+def get_snapshot_store():
+    global _store
+    if _store is None:
+        _store = OptionSnapshotStore()
+    return _store
@@ -0,0 +1,220 @@
+# strategies.py
+
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from metrics import timed
+from montecarlo import bs_price, simulate_price_paths
+from trading_calendar import get_trading_calendar
+
+# Multi-leg search over the chains find_best_options already receives. Legs are
+# pruned first (open interest, bid/ask width, strike band), then every strategy
+# family is scored with broadcasting. Expected payoff is linear in the legs, so
+# each leg's payoff is averaged over the simulated paths once; pair matrices are
+# sums of those vectors. Only the finalists get the full per-path pass
+# (probability of profit).
+#
+# Buys fill at the ask, sells at the bid. Only defined-risk structures are built
+# (no naked short legs). Crossed/locked quotes are dropped and every structure must
+# risk at least one tick, so a stale leg pricing a spread at ~0 can't win on
+# return-per-risk; sizing is capped by each leg's open interest and volume.
+
+MULTIPLIER = 100
+TICK = 0.05
+
+def _prepare_side(df, underlying_price, min_open_interest, max_spread_pct, strike_band):
+    if df is None or df.empty:
+        return None
+    strike = df['strike'].to_numpy(dtype=float)
+    bid = df['bid'].to_numpy(dtype=float)
+    ask = df['ask'].to_numpy(dtype=float)
+    oi = df['openInterest'].fillna(0).to_numpy(dtype=float) if 'openInterest' in df else np.zeros(len(df))
+    volume = df['volume'].to_numpy(dtype=float) if 'volume' in df else np.full(len(df), np.nan)
+    iv = df['impliedVolatility'].to_numpy(dtype=float) if 'impliedVolatility' in df else np.full(len(df), np.nan)
+    mid = (bid + ask) / 2
+    keep = (np.isfinite(bid) & np.isfinite(ask) & (ask > bid) & (bid >= 0) & (oi >= min_open_interest)
+            & ((ask - bid) <= max_spread_pct * np.maximum(mid, 0.01))
+            & (np.abs(strike / underlying_price - 1) <= strike_band))
+    if not keep.any():
+        return None
+    order = np.argsort(strike[keep])
+    return {name: arr[keep][order] for name, arr in
+            (('strike', strike), ('bid', bid), ('ask', ask), ('oi', oi), ('volume', volume), ('iv', iv))}
+
+def _intrinsic(kind, spots, strikes):
+    # (n_strikes, n_paths) payoff matrix at expiry.
+    if kind == 'call':
+        return np.maximum(spots[None, :] - strikes[:, None], 0)
+    return np.maximum(strikes[:, None] - spots[None, :], 0)
+
+def _top(score, k):
+    flat = np.where(np.isfinite(score), score, -np.inf).ravel()
+    k = min(k, int(np.isfinite(flat).sum()))
+    if k <= 0:
+        return []
+    idx = np.argpartition(-flat, k - 1)[:k]
+    return [np.unravel_index(i, score.shape) for i in idx[np.argsort(-flat[idx])]]
+
+def _candidate(name, legs, net_debit, max_loss, max_profit, expected_payoff):
+    return {
+        'strategy': name,
+        'legs': legs,
+        'net_debit': float(net_debit),
+        'max_loss': float(max_loss),
+        'max_profit': float(max_profit),
+        'expected_pl': float(expected_payoff - net_debit),
+        'expected_return': float((expected_payoff - net_debit) / max_loss),
+    }
+
+def _leg(action, kind, side, i, expiry):
+    return {'action': action, 'type': kind, 'strike': float(side['strike'][i]), 'expiry': expiry,
+            'price': float(side['ask'][i] if action == 'buy' else side['bid'][i]), 'iv': float(side['iv'][i]),
+            'open_interest': float(side['oi'][i]), 'volume': float(side['volume'][i])}
+
+def _liquidity_limit(legs, max_participation):
+    # Contracts the thinnest leg can absorb: a fraction of min(open interest, volume);
+    # volume is ignored when the chain doesn't report it.
+    depth = [min(leg['open_interest'], leg['volume']) if np.isfinite(leg['volume']) else leg['open_interest']
+             for leg in legs]
+    return int(max_participation * min(depth))
+
+def _verticals(expiry, kind, side, expected, per_family, max_risk, min_risk):
+    # Long leg a, short leg b at every strike pair (a != b).
+    k = side['strike']
+    width = np.abs(k[:, None] - k[None, :])
+    debit = side['ask'][:, None] - side['bid'][None, :]
+    is_debit = (k[:, None] < k[None, :]) if kind == 'call' else (k[:, None] > k[None, :])
+    max_loss = np.where(is_debit, debit, width + debit)
+    max_profit = np.where(is_debit, width - debit, -debit)
+    payoff = expected[:, None] - expected[None, :]
+    valid = ((width > 0) & (np.abs(debit) >= min_risk) & (max_loss >= min_risk) & (max_profit > 0)
+             & (max_loss <= max_risk))
+    score = np.where(valid, (payoff - debit) / np.where(valid, max_loss, 1), np.nan)
+    out = []
+    for a, b in _top(score, per_family):
+        if kind == 'call':
+            name = 'bull_call_spread' if is_debit[a, b] else 'bear_call_spread'
+        else:
+            name = 'bear_put_spread' if is_debit[a, b] else 'bull_put_spread'
+        legs = [_leg('buy', kind, side, a, expiry), _leg('sell', kind, side, b, expiry)]
+        out.append(_candidate(name, legs, debit[a, b], max_loss[a, b], max_profit[a, b], payoff[a, b]))
+    return out
+
+def _straddles_strangles(expiry, calls, puts, exp_calls, exp_puts, per_family, max_risk, min_risk):
+    out = []
+    # Strangles (put strike < call strike) and straddles (equal strikes) from one matrix.
+    debit = puts['ask'][:, None] + calls['ask'][None, :]
+    payoff = exp_puts[:, None] + exp_calls[None, :]
+    diff = calls['strike'][None, :] - puts['strike'][:, None]
+    for name, mask in (('straddle', diff == 0), ('strangle', diff > 0)):
+        valid = mask & (debit >= min_risk) & (debit <= max_risk)
+        score = np.where(valid, (payoff - debit) / np.where(valid, debit, 1), np.nan)
+        for p, c in _top(score, per_family):
+            legs = [_leg('buy', 'put', puts, p, expiry), _leg('buy', 'call', calls, c, expiry)]
+            out.append(_candidate(name, legs, debit[p, c], debit[p, c], np.inf, payoff[p, c]))
+    return out
+
+def _calendars(kind, near_exp, near, far_exp, far, spots, t_remaining, r, per_family, max_risk, min_risk):
+    # Short the near leg, long the far leg at the same strike; valued when the near leg expires.
+    common, i_near, i_far = np.intersect1d(near['strike'], far['strike'], return_indices=True)
+    if len(common) == 0:
+        return []
+    debit = far['ask'][i_far] - near['bid'][i_near]
+    iv_far = np.where(np.isfinite(far['iv'][i_far]), far['iv'][i_far], np.nan)
+    is_call = kind == 'call'
+    far_value = bs_price(spots[None, :], common[:, None], t_remaining, iv_far[:, None], is_call, r)
+    value = far_value - _intrinsic(kind, spots, common)
+    expected = value.mean(axis=1)
+    best = value.max(axis=1) - debit
+    valid = (debit >= min_risk) & (debit <= max_risk) & np.isfinite(expected)
+    score = np.where(valid, (expected - debit) / np.where(valid, debit, 1), np.nan)
+    out = []
+    for (i,) in _top(score, per_family):
+        legs = [_leg('sell', kind, near, i_near[i], near_exp), _leg('buy', kind, far, i_far[i], far_exp)]
+        out.append(_candidate(f'{kind}_calendar', legs, debit[i], debit[i], best[i], expected[i]))
+    return out
+
+def _path_pl(candidate, terminal_by_expiry, years_by_expiry, r):
+    # Per-path P/L at the first leg expiry (later legs marked with Black-Scholes at their IV).
+    horizon = min(leg['expiry'] for leg in candidate['legs'])
+    spots = terminal_by_expiry[horizon]
+    value = np.zeros_like(spots)
+    for leg in candidate['legs']:
+        sign = 1 if leg['action'] == 'buy' else -1
+        if leg['expiry'] == horizon:
+            leg_value = _intrinsic(leg['type'], spots, np.array([leg['strike']]))[0]
+        else:
+            t = years_by_expiry[leg['expiry']] - years_by_expiry[horizon]
+            leg_value = bs_price(spots, leg['strike'], t, leg['iv'], leg['type'] == 'call', r)
+        value += sign * leg_value
+    return value - candidate['net_debit']
+
+@timed()
+def find_best_strategies(options_chains, underlying_price, capital, sigma, top_n=5, mu=0.0, r=0.0,
+                         n_sims=2000, min_open_interest=10, max_spread_pct=0.5, strike_band=0.2,
+                         calendar_span=2, calendar_sims=500, families=("vertical", "straddle", "strangle", "calendar"),
+                         min_risk=TICK, max_participation=0.1, seed=None, today=None):
+    today = pd.Timestamp(today or datetime.today().date())
+    max_risk = capital / MULTIPLIER
+    calendar = get_trading_calendar()
+    sides, sessions = {}, {}
+    for exp_date, chain in options_chains.items():
+        if chain is None:
+            continue
+        n = calendar.sessions_between(today, exp_date)
+        if n <= 0:
+            continue
+        prepared = {kind: _prepare_side(getattr(chain, f"{kind}s"), underlying_price, min_open_interest,
+                                        max_spread_pct, strike_band) for kind in ('call', 'put')}
+        if any(v is not None for v in prepared.values()):
+            sides[exp_date] = prepared
+            sessions[exp_date] = n
+    if not sides:
+        return []
+
+    paths = simulate_price_paths(underlying_price, mu, sigma, n_days=max(sessions.values()) + 1, n_sims=n_sims, seed=seed)
+    terminal = {exp: paths[:, n] for exp, n in sessions.items()}
+    years = {exp: n / 252 for exp, n in sessions.items()}
+    expected = {
+        exp: {kind: _intrinsic(kind, terminal[exp], side['strike']).mean(axis=1)
+              for kind, side in by_kind.items() if side is not None}
+        for exp, by_kind in sides.items()
+    }
+
+    per_family = max(top_n, 5)
+    candidates = []
+    expiries = sorted(sides)
+    for e_i, exp in enumerate(expiries):
+        calls, puts = sides[exp]['call'], sides[exp]['put']
+        if "vertical" in families:
+            for kind, side in (('call', calls), ('put', puts)):
+                if side is not None and len(side['strike']) > 1:
+                    candidates += _verticals(exp, kind, side, expected[exp][kind], per_family, max_risk, min_risk)
+        if calls is not None and puts is not None and ({"straddle", "strangle"} & set(families)):
+            found = _straddles_strangles(exp, calls, puts, expected[exp]['call'], expected[exp]['put'], per_family, max_risk, min_risk)
+            candidates += [c for c in found if c['strategy'] in families]
+        if "calendar" in families:
+            for far_exp in expiries[e_i + 1:e_i + 1 + calendar_span]:
+                for kind in ('call', 'put'):
+                    near, far = sides[exp][kind], sides[far_exp][kind]
+                    if near is not None and far is not None:
+                        # Calendars need a Black-Scholes pass per (strike, path); a path subsample keeps it cheap.
+                        candidates += _calendars(kind, exp, near, far_exp, far, terminal[exp][:calendar_sims],
+                                                 years[far_exp] - years[exp], r, per_family, max_risk, min_risk)
+
+    candidates.sort(key=lambda c: c['expected_return'], reverse=True)
+    best = []
+    for c in candidates:
+        if len(best) == top_n:
+            break
+        c['num_contracts'] = min(int(capital // (c['max_loss'] * MULTIPLIER)),
+                                 _liquidity_limit(c['legs'], max_participation))
+        if c['num_contracts'] <= 0:
+            continue
+        pl = _path_pl(c, terminal, years, r)
+        c['probability_of_profit'] = round(float((pl > 0).mean()) * 100, 1)
+        c['total_cost'] = c['num_contracts'] * c['net_debit'] * MULTIPLIER
+        c['total_max_loss'] = c['num_contracts'] * c['max_loss'] * MULTIPLIER
+        best.append(c)
+    return best
@@ -0,0 +1,262 @@
+# streaming.py
+
+import heapq
+import math
+import random
+from collections import deque
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+from datasource import fetch_history_offline
+from technicals import compute_signals
+
+# Online counterparts of compute_technical_indicators: every accumulator is O(1)
+# (amortized for the rolling min/max) per update, so a watchlist can be followed
+# tick by tick without re-downloading or re-scanning history.
+
+class RollingWindow:
+    # Fixed-size ring buffer with running sum and sum of squares.
+    def __init__(self, size):
+        self.size = size
+        self.buf = np.zeros(size)
+        self.count = 0
+        self.pos = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def update(self, value):
+        if self.count == self.size:
+            old = self.buf[self.pos]
+            self.total -= old
+            self.total_sq -= old * old
+        else:
+            self.count += 1
+        self.buf[self.pos] = value
+        self.pos = (self.pos + 1) % self.size
+        self.total += value
+        self.total_sq += value * value
+
+    @property
+    def full(self):
+        return self.count == self.size
+
+    def mean(self):
+        return self.total / self.size if self.full else np.nan
+
+    def std(self):
+        # Sample std (ddof=1), matching pandas rolling().std().
+        if not self.full:
+            return np.nan
+        var = (self.total_sq - self.total * self.total / self.size) / (self.size - 1)
+        return math.sqrt(max(var, 0.0))
+
+class EMA:
+    # Same recursion as pandas ewm(span=..., adjust=False).
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1)
+        self.value = np.nan
+
+    def update(self, value):
+        self.value = value if np.isnan(self.value) else self.alpha * value + (1 - self.alpha) * self.value
+        return self.value
+
+class RollingExtreme:
+    # Monotonic deque over the last `size` updates; `greater=True` tracks the max.
+    def __init__(self, size, greater):
+        self.size = size
+        self.greater = greater
+        self.items = deque()
+        self.index = 0
+
+    def update(self, value):
+        while self.items and (self.items[-1][1] <= value if self.greater else self.items[-1][1] >= value):
+            self.items.pop()
+        self.items.append((self.index, value))
+        if self.items[0][0] <= self.index - self.size:
+            self.items.popleft()
+        self.index += 1
+
+    def value(self):
+        return self.items[0][1] if self.index >= self.size else np.nan
+
+class StreamingIndicators:
+    def __init__(self, k_period=14, d_period=3):
+        self.sma = {n: RollingWindow(n) for n in (20, 50, 200)}
+        self.ema12 = EMA(12)
+        self.ema26 = EMA(26)
+        self.ema9 = EMA(9)
+        self.gains = RollingWindow(14)
+        self.losses = RollingWindow(14)
+        self.vol20 = RollingWindow(20)
+        self.low_min = RollingExtreme(k_period, greater=False)
+        self.high_max = RollingExtreme(k_period, greater=True)
+        self.stoch_d = RollingWindow(d_period)
+        self.obv = 0.0
+        self.prev_close = None
+        self.bars = 0
+        self.last_bar = None
+
+    def update(self, bar):
+        close = float(bar['Close'])
+        volume = float(bar.get('Volume', 0) or 0)
+        for window in self.sma.values():
+            window.update(close)
+        ema12 = self.ema12.update(close)
+        ema26 = self.ema26.update(close)
+        ema9 = self.ema9.update(close)
+        if self.prev_close is not None:
+            change = close - self.prev_close
+            self.gains.update(max(change, 0.0))
+            self.losses.update(max(-change, 0.0))
+            if change > 0:
+                self.obv += volume
+            elif change < 0:
+                self.obv -= volume
+        self.vol20.update(volume)
+        self.low_min.update(float(bar.get('Low', close)))
+        self.high_max.update(float(bar.get('High', close)))
+        low, high = self.low_min.value(), self.high_max.value()
+        k = 100 * (close - low) / (high - low) if high != low else np.nan
+        if not np.isnan(k):
+            self.stoch_d.update(k)
+        self.prev_close = close
+        self.bars += 1
+        self.last_bar = {'Close': close, 'Volume': volume}
+
+        avg_gain, avg_loss = self.gains.mean(), self.losses.mean()
+        rs = avg_gain / avg_loss if avg_loss else np.nan
+        bb_middle = self.sma[20].mean()
+        bb_std = self.sma[20].std()
+        return {
+            'sma20': bb_middle,
+            'sma50': self.sma[50].mean(),
+            'sma200': self.sma[200].mean(),
+            'rsi': 100 - (100 / (1 + rs)) if not np.isnan(rs) else 50,
+            'macd': ema12 - ema26,
+            # Mirrors technicals.compute_technical_indicators, which uses the 9-span EMA of close.
+            'macd_signal': ema9,
+            'bb_middle': bb_middle,
+            'bb_upper': bb_middle + 2 * bb_std,
+            'bb_lower': bb_middle - 2 * bb_std,
+            'vol_ma20': self.vol20.mean(),
+            'stochastic': (k, self.stoch_d.mean()),
+            'obv': self.obv,
+        }
+
+    def signals(self, techs):
+        latest = {
+            'Close': pd.Series([self.last_bar['Close']]),
+            'Volume': pd.Series([self.last_bar['Volume']]),
+        }
+        return compute_signals(latest, techs)
+
+class BarBuilder:
+    # Rolls quotes ({'timestamp', 'price', 'size'}) into fixed-interval OHLCV bars.
+    def __init__(self, interval=timedelta(minutes=1)):
+        self.interval = interval
+        self.current = None
+
+    def _bucket(self, ts):
+        ts = pd.Timestamp(ts)
+        return ts.floor(self.interval)
+
+    def update(self, quote):
+        bucket = self._bucket(quote['timestamp'])
+        price = float(quote['price'])
+        size = float(quote.get('size', 0) or 0)
+        finished = None
+        if self.current is not None and bucket != self.current['timestamp']:
+            finished = self.current
+            self.current = None
+        if self.current is None:
+            self.current = {'timestamp': bucket, 'Open': price, 'High': price, 'Low': price, 'Close': price, 'Volume': size}
+        else:
+            self.current['High'] = max(self.current['High'], price)
+            self.current['Low'] = min(self.current['Low'], price)
+            self.current['Close'] = price
+            self.current['Volume'] += size
+        return finished
+
+    def flush(self):
+        # Hands back the partial bar at the end of a quote stream.
+        finished, self.current = self.current, None
+        return finished
+
+def quote_bars(quotes, interval=timedelta(minutes=1)):
+    # Turns a (symbol, quote) stream into (symbol, bar) as each symbol's bars close,
+    # so a quote feed can drive StreamingWatchlist.run like the bar feeds below.
+    builders = {}
+    for symbol, quote in quotes:
+        builder = builders.get(symbol)
+        if builder is None:
+            builder = builders[symbol] = BarBuilder(interval)
+        bar = builder.update(quote)
+        if bar is not None:
+            yield symbol, bar
+    for symbol, builder in builders.items():
+        bar = builder.flush()
+        if bar is not None:
+            yield symbol, bar
+
+def _frame_bars(symbol, df):
+    index = pd.to_datetime(df.index, utc=True)
+    cols = [c for c in ('Open', 'High', 'Low', 'Close', 'Volume') if c in df.columns]
+    for ts, row in zip(index, df[cols].itertuples(index=False)):
+        bar = dict(zip(cols, row))
+        bar['timestamp'] = ts
+        yield ts, symbol, bar
+
+def replay_csv(symbols, start=None, end=None):
+    # Replays the offline CSV histories as one time-ordered stream of (symbol, bar).
+    streams = []
+    for symbol in symbols:
+        df = fetch_history_offline(symbol)
+        if df.empty:
+            continue
+        index = pd.to_datetime(df.index, utc=True)
+        mask = np.ones(len(df), dtype=bool)
+        if start is not None:
+            mask &= index >= pd.Timestamp(start, tz='UTC')
+        if end is not None:
+            mask &= index <= pd.Timestamp(end, tz='UTC')
+        streams.append(_frame_bars(symbol, df[mask]))
+    for _, symbol, bar in heapq.merge(*streams, key=lambda item: item[0]):
+        yield symbol, bar
+
+def mock_feed(symbols, n_ticks=1000, start_price=100.0, sigma=0.001, interval=timedelta(minutes=1), seed=None, start=None):
+    # Local random-walk stand-in for a live feed; yields (symbol, bar) in round-robin.
+    rng = random.Random(seed)
+    prices = {symbol: start_price for symbol in symbols}
+    ts = pd.Timestamp(start or datetime.now().replace(second=0, microsecond=0))
+    for _ in range(n_ticks):
+        for symbol in symbols:
+            open_ = prices[symbol]
+            close = open_ * math.exp(rng.gauss(0, sigma))
+            high = max(open_, close) * (1 + abs(rng.gauss(0, sigma / 2)))
+            low = min(open_, close) * (1 - abs(rng.gauss(0, sigma / 2)))
+            prices[symbol] = close
+            yield symbol, {'timestamp': ts, 'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': rng.randint(100, 10000)}
+        ts += interval
+
+class StreamingWatchlist:
+    def __init__(self):
+        self.states = {}
+
+    def warm_up(self, symbol, price_history):
+        # Prime a symbol's accumulators from history so intraday bars start with context.
+        state = self.states.setdefault(symbol, StreamingIndicators())
+        for _, _, bar in _frame_bars(symbol, price_history):
+            state.update(bar)
+        return state
+
+    def on_bar(self, symbol, bar):
+        state = self.states.setdefault(symbol, StreamingIndicators())
+        techs = state.update(bar)
+        return techs, state.signals(techs)
+
+    def run(self, feed, callback=None):
+        for symbol, bar in feed:
+            techs, signals = self.on_bar(symbol, bar)
+            if callback is not None:
+                callback(symbol, bar, techs, signals)
@@ -6,7 +6,9 @@ from scipy.signal import argrelextrema
 from sklearn.linear_model import LinearRegression
 import numpy as np
 import pandas as pd
+from metrics import timed
 
+@timed()
 def compute_technical_indicators(df):
     import numpy as np
     indicators = {}
@@ -44,6 +46,7 @@ def compute_technical_indicators(df):
 
     return indicators
 
+@timed()
 def compute_signals(price_history, techs):
     signals = {}
     signals['above_ma20'] = price_history['Close'].iloc[-1] > techs['sma20']
@@ -57,6 +60,7 @@ def compute_signals(price_history, techs):
     )
     return signals
 
+@timed()
 def fibonacci_retracement(df, lookback=120):
     # Find swing high/low in the window
     high = df['High'][-lookback:].max()
@@ -65,6 +69,7 @@ def fibonacci_retracement(df, lookback=120):
     levels = [high - diff * r for r in [0.236, 0.382, 0.5, 0.618, 0.786]]
     return {'levels': levels, 'high': high, 'low': low}
 
+@timed()
 def detect_breakout(df, window=20, threshold=2.5):
     highs = df['High'].rolling(window).max()
     lows = df['Low'].rolling(window).min()
@@ -76,6 +81,7 @@ def detect_breakout(df, window=20, threshold=2.5):
         return "breakout_down"
     return "none"
 
+@timed()
 def detect_engulfing(df):
     # Simple example: last 2 candles
     open1, close1 = df['Open'].iloc[-2], df['Close'].iloc[-2]
@@ -86,6 +92,7 @@ def detect_engulfing(df):
         return "bearish_engulfing"
     return "none"
 
+@timed()
 def heikin_ashi(df):
     ha = df.copy()
     ha['HA_Close'] = (df['Open'] + df['High'] + df['Low'] + df['Close']) / 4
@@ -95,6 +102,7 @@ def heikin_ashi(df):
     return ha
 
 
+@timed()
 def moon_phase(date=None):
     # Returns moon phase as string for given date (default: today)
     date = date or ephem.now()
@@ -114,6 +122,7 @@ def moon_phase(date=None):
     else:
         return "Waning Crescent"
 
+@timed()
 def renko_bricks(df, brick_size=None):
     df2 = df[['Open','High','Low','Close','Volume']].copy().reset_index()
     df2.columns = ['date','open','high','low','close','volume']
@@ -129,6 +138,7 @@ def renko_bricks(df, brick_size=None):
 
 
 
+@timed()
 def support_resistance(df, order=10):
     close = df['Close']
     min_idx = argrelextrema(close.values, np.less, order=order)[0]
@@ -137,11 +147,13 @@ def support_resistance(df, order=10):
     resistances = [(close.index[i], close.iloc[i]) for i in max_idx]
     return supports, resistances
 
+@timed()
 def dynamic_support_resistance(df, window=30):
     rolling_min = df['Close'].rolling(window).min()
     rolling_max = df['Close'].rolling(window).max()
     return rolling_min, rolling_max
 
+@timed()
 def auto_trendline(df, window=50):
     close = df['Close'][-window:]
     X = np.arange(len(close)).reshape(-1,1)
@@ -150,6 +162,7 @@ def auto_trendline(df, window=50):
     trend = reg.predict(X)
     return trend, close.index
 
+@timed()
 def stochastic_oscillator(df, k_period=14, d_period=3):
     low_min = df['Low'].rolling(window=k_period).min()
     high_max = df['High'].rolling(window=k_period).max()
@@ -157,6 +170,7 @@ def stochastic_oscillator(df, k_period=14, d_period=3):
     d = k.rolling(window=d_period).mean()
     return k, d
 
+@timed()
 def on_balance_volume(df):
     obv = [0]
     for i in range(1, len(df)):
@@ -0,0 +1,84 @@
+# test_service.py
+
+import asyncio
+import json
+
+from service import RecommendationService
+
+# Runs the HTTP service fully offline against training_dataset/ on a free port.
+
+async def _get(port, target, method="GET"):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    lines = head.decode('latin-1').split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    assert int(headers['Content-Length']) == len(body)
+    return int(lines[0].split()[1]), headers, body
+
+def _run(scenario):
+    async def main():
+        service = RecommendationService(offline_mode=True)
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await scenario(service, port)
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.executor.shutdown()
+    return asyncio.run(main())
+
+def test_recommendation_offline():
+    async def scenario(service, port):
+        status, headers, body = await _get(port, "/recommendation?symbol=nvda")
+        assert status == 200
+        assert headers['Content-Type'] == 'application/json'
+        payload = json.loads(body)
+        assert payload['ticker'] == "NVDA"
+        assert payload['direction'] in ("call", "put")
+        assert payload['underlying_price'] > 0
+        assert payload['timings']['stages']
+        assert payload['volatility']['regime'] in ("low", "normal", "high")
+    _run(scenario)
+
+def test_chart_png_and_svg():
+    async def scenario(service, port):
+        status, headers, body = await _get(port, "/chart?symbol=NVDA")
+        assert status == 200
+        assert headers['Content-Type'] == 'image/png'
+        assert body.startswith(b"\x89PNG")
+        status, headers, body = await _get(port, "/chart?symbol=NVDA&format=svg")
+        assert status == 200
+        assert headers['Content-Type'] == 'image/svg+xml'
+        assert b"<svg" in body
+    _run(scenario)
+
+def test_client_errors():
+    async def scenario(service, port):
+        assert (await _get(port, "/recommendation"))[0] == 400
+        assert (await _get(port, "/chart?symbol=NVDA&format=gif"))[0] == 400
+        assert (await _get(port, "/rank?symbol=NVDA&capital=lots"))[0] == 400
+        assert (await _get(port, "/recommendation?symbol=NVDA", method="POST"))[0] == 400
+        assert (await _get(port, "/nope"))[0] == 404
+        status, _, body = await _get(port, "/recommendation?symbol=NOSUCHTICKER")
+        assert status == 422
+        assert "error" in json.loads(body)
+        stats = json.loads((await _get(port, "/stats"))[2])
+        assert stats['routes']['/recommendation']['errors'] == 3
+    _run(scenario)
+
+def test_concurrent_requests_coalesce():
+    async def scenario(service, port):
+        responses = await asyncio.gather(*[_get(port, "/recommendation?symbol=GOOGL") for _ in range(8)])
+        assert [status for status, _, _ in responses] == [200] * 8
+        assert len({body for _, _, body in responses}) == 1
+        stats = json.loads((await _get(port, "/stats"))[2])
+        assert stats['computations'] == 1
+        assert stats['coalesced'] >= 1
+        assert stats['coalesced'] + stats['cache_hits'] == 7
+        assert stats['routes']['/recommendation']['requests'] == 8
+    _run(scenario)
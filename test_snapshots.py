@@ -0,0 +1,42 @@
+# test_snapshots.py
+
+import pandas as pd
+
+from snapshots import Chain, OptionSnapshotStore
+
+# Record -> reload -> point-in-time lookups against a temporary store root.
+
+def _chain(bid):
+    calls = pd.DataFrame({'strike': [100.0, 105.0], 'bid': [bid, bid / 2], 'ask': [bid + 0.1, bid / 2 + 0.1]})
+    puts = pd.DataFrame({'strike': [95.0], 'bid': [bid / 3], 'ask': [bid / 3 + 0.1]})
+    return Chain(calls, puts)
+
+def _recorded(root):
+    store = OptionSnapshotStore(root)
+    store.record("SPY", "2024-02-16", _chain(3.0), pd.Timestamp("2024-01-02 15:00"))
+    store.record("SPY", "2024-02-16", _chain(4.0), pd.Timestamp("2024-01-10 15:00"))
+    store.record("SPY", "2024-03-15", _chain(5.0), pd.Timestamp("2024-01-10 15:00"))
+    return store
+
+def test_record_does_not_duplicate_index_entries(tmp_path):
+    store = _recorded(str(tmp_path))
+    stamps, paths = store._symbol_index("SPY")["2024-02-16"]
+    assert len(stamps) == len(paths) == 2
+    assert stamps == sorted(stamps)
+
+def test_lookups_in_process_and_after_reload(tmp_path):
+    live = _recorded(str(tmp_path))
+    for store in (live, OptionSnapshotStore(str(tmp_path))):
+        # Nothing had been recorded yet: no look-ahead.
+        assert store.load_chain("SPY", "2024-02-16", "2020-01-01") is None
+        assert store.snapshot_time("SPY", "2024-02-16", "2020-01-01") is None
+
+        assert store.snapshot_time("SPY", "2024-02-16", "2024-01-05") == pd.Timestamp("2024-01-02 15:00")
+        assert store.load_chain("SPY", "2024-02-16", "2024-01-05").calls['bid'].tolist() == [3.0, 1.5]
+        assert store.load_chain("SPY", "2024-02-16", "2024-01-11").calls['bid'].iloc[0] == 4.0
+        assert store.load_chain("SPY", "2024-02-16", "2024-01-09", max_staleness=pd.Timedelta(days=4)) is None
+
+        assert sorted(store.chains_as_of("SPY", "2024-01-05")) == ["2024-02-16"]
+        chains = store.chains_as_of("SPY", "2024-01-11")
+        assert sorted(chains) == ["2024-02-16", "2024-03-15"]
+        assert chains["2024-03-15"].calls['bid'].iloc[0] == 5.0
@@ -0,0 +1,84 @@
+# trading_calendar.py
+
+import os
+import numpy as np
+import pandas as pd
+
+from config import TRADING_CALENDAR_CACHE_PATH
+
+CALENDAR_START = "2000-01-01"
+CALENDAR_END = "2035-12-31"
+
+_calendar = None
+
+def _to_day(date):
+    return np.datetime64(pd.Timestamp(date).date(), 'D')
+
+class TradingCalendar:
+    # NYSE sessions held as a sorted datetime64[D] array; every lookup is a searchsorted.
+    def __init__(self, sessions):
+        self.sessions = np.unique(np.asarray(sessions, dtype='datetime64[D]'))
+
+    @classmethod
+    def load(cls, cache_path=TRADING_CALENDAR_CACHE_PATH, start=CALENDAR_START, end=CALENDAR_END):
+        if os.path.exists(cache_path):
+            sessions = np.load(cache_path)
+            if len(sessions) and sessions[0] <= _to_day(start) + 7 and sessions[-1] >= _to_day(end) - 7:
+                return cls(sessions)
+        import pandas_market_calendars as mcal
+        days = mcal.get_calendar('NYSE').valid_days(start_date=start, end_date=end)
+        sessions = np.array([d.date() for d in days], dtype='datetime64[D]')
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        np.save(cache_path, sessions)
+        return cls(sessions)
+
+    def _check_range(self, day):
+        if day < self.sessions[0] or day > self.sessions[-1]:
+            raise ValueError(f"{day} is outside the loaded calendar ({self.sessions[0]} to {self.sessions[-1]})")
+
+    def is_open(self, date):
+        day = _to_day(date)
+        self._check_range(day)
+        i = np.searchsorted(self.sessions, day)
+        return bool(i < len(self.sessions) and self.sessions[i] == day)
+
+    def next_session(self, date):
+        day = _to_day(date)
+        self._check_range(day)
+        i = np.searchsorted(self.sessions, day, side='right')
+        if i >= len(self.sessions):
+            raise ValueError(f"No session after {day} in the loaded calendar")
+        return pd.Timestamp(self.sessions[i])
+
+    def previous_session(self, date):
+        day = _to_day(date)
+        self._check_range(day)
+        i = np.searchsorted(self.sessions, day, side='left') - 1
+        if i < 0:
+            raise ValueError(f"No session before {day} in the loaded calendar")
+        return pd.Timestamp(self.sessions[i])
+
+    def sessions_ahead(self, date, n):
+        # Anchors on the last session on or before `date`, then steps n sessions.
+        day = _to_day(date)
+        self._check_range(day)
+        i = np.searchsorted(self.sessions, day, side='right') - 1 + n
+        if i < 0 or i >= len(self.sessions):
+            raise ValueError(f"{n} sessions from {day} falls outside the loaded calendar")
+        return pd.Timestamp(self.sessions[i])
+
+    def sessions_between(self, start, end):
+        # Number of sessions in (start, end].
+        start_day, end_day = _to_day(start), _to_day(end)
+        return int(np.searchsorted(self.sessions, end_day, side='right') - np.searchsorted(self.sessions, start_day, side='right'))
+
+    def sessions_in_range(self, start, end):
+        lo = np.searchsorted(self.sessions, _to_day(start), side='left')
+        hi = np.searchsorted(self.sessions, _to_day(end), side='right')
+        return pd.DatetimeIndex(self.sessions[lo:hi])
+
+def get_trading_calendar():
+    global _calendar
+    if _calendar is None:
+        _calendar = TradingCalendar.load()
+    return _calendar
@@ -1,19 +1,21 @@
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from datasource import fetch_option_chain_data
+from trading_calendar import get_trading_calendar
 
 TRADE_LOG = "trade_log.csv"
-HOLD_DAYS = 10  # Your fixed holding period
+HOLD_DAYS = 10  # Your fixed holding period, in trading sessions
 
 df = pd.read_csv(TRADE_LOG)
 now = datetime.now()
+calendar = get_trading_calendar()
 
 for idx, row in df.iterrows():
     if pd.notnull(row.get("exit_price")) and row["exit_price"] != "":
         continue  # already exited
 
     entry_time = pd.to_datetime(row["entry_timestamp"])
-    if (now - entry_time).days < HOLD_DAYS:
+    if calendar.sessions_between(entry_time, now) < HOLD_DAYS:
         continue  # not due yet
 
     # Parse rec1 to get contract info
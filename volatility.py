@@ -0,0 +1,129 @@
+# volatility.py
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.signal import lfilter
+
+from metrics import timed
+
+# Rolling realized-vol estimators and EWMA/GARCH(1,1) forecasts over a history
+# frame, all vectorized over the full series and annualized. Results are cached
+# per symbol (keyed on length, last bar and parameters) so repeat requests for the
+# same history are free.
+
+TRADING_DAYS = 252
+_cache = {}
+
+def _log(a, b):
+    return np.log(a / b)
+
+def close_to_close(df, window=20):
+    r = _log(df['Close'], df['Close'].shift(1))
+    return r.rolling(window).std() * np.sqrt(TRADING_DAYS)
+
+def parkinson(df, window=20):
+    hl = _log(df['High'], df['Low']) ** 2
+    return np.sqrt(hl.rolling(window).mean() / (4 * np.log(2)) * TRADING_DAYS)
+
+def garman_klass(df, window=20):
+    hl = _log(df['High'], df['Low']) ** 2
+    co = _log(df['Close'], df['Open']) ** 2
+    var = (0.5 * hl - (2 * np.log(2) - 1) * co).rolling(window).mean()
+    return np.sqrt(var.clip(lower=0) * TRADING_DAYS)
+
+def yang_zhang(df, window=20):
+    o = _log(df['Open'], df['Close'].shift(1))
+    c = _log(df['Close'], df['Open'])
+    rs = _log(df['High'], df['Close']) * _log(df['High'], df['Open']) + _log(df['Low'], df['Close']) * _log(df['Low'], df['Open'])
+    k = 0.34 / (1.34 + (window + 1) / (window - 1))
+    var = o.rolling(window).var() + k * c.rolling(window).var() + (1 - k) * rs.rolling(window).mean()
+    return np.sqrt(var.clip(lower=0) * TRADING_DAYS)
+
+def ewma_vol(returns, lam=0.94):
+    # RiskMetrics: value at t is the forecast for t+1 given returns through t.
+    return np.sqrt((returns ** 2).ewm(alpha=1 - lam, adjust=False).mean() * TRADING_DAYS)
+
+def _garch_variance(r2, omega, alpha, beta, var0):
+    # sigma2[t] = omega + alpha*r2[t-1] + beta*sigma2[t-1] as one IIR filter pass.
+    x = np.empty_like(r2)
+    x[0] = var0
+    x[1:] = omega + alpha * r2[:-1]
+    zi = np.array([0.0])
+    out, _ = lfilter([1.0], [1.0, -beta], x, zi=zi)
+    return out
+
+def fit_garch(returns):
+    # Gaussian GARCH(1,1) on daily returns; returns params and the conditional variance series.
+    r = np.asarray(returns, dtype=float)
+    r = r[np.isfinite(r)] - np.nanmean(r)
+    r2 = r ** 2
+    var0 = r2.mean()
+
+    def nll(params):
+        omega, alpha, beta = params
+        if alpha + beta >= 0.999:
+            return 1e10
+        var = np.maximum(_garch_variance(r2, omega, alpha, beta, var0), 1e-12)
+        return 0.5 * np.sum(np.log(var) + r2 / var)
+
+    x0 = [var0 * 0.05, 0.08, 0.9]
+    res = minimize(nll, x0, method='L-BFGS-B', bounds=[(1e-12, None), (0.0, 0.999), (0.0, 0.999)])
+    omega, alpha, beta = res.x
+    variance = _garch_variance(r2, omega, alpha, beta, var0)
+    next_var = omega + alpha * r2[-1] + beta * variance[-1]
+    return {'omega': omega, 'alpha': alpha, 'beta': beta, 'converged': bool(res.success),
+            'variance': variance, 'next_variance': next_var}
+
+def garch_forecast(params, horizon=10):
+    # Mean annualized vol over the next `horizon` days.
+    persistence = params['alpha'] + params['beta']
+    long_run = params['omega'] / (1 - persistence) if persistence < 1 else params['next_variance']
+    steps = long_run + persistence ** np.arange(horizon) * (params['next_variance'] - long_run)
+    return float(np.sqrt(steps.mean() * TRADING_DAYS))
+
+@timed()
+def volatility_features(price_history, symbol=None, window=20, lam=0.94, horizon=10):
+    stamp = (len(price_history), str(price_history.index[-1]), window, lam, horizon)
+    if symbol is not None and symbol in _cache and _cache[symbol][0] == stamp:
+        return _cache[symbol][1]
+    df = price_history
+    returns = _log(df['Close'], df['Close'].shift(1))
+    features = pd.DataFrame(index=df.index)
+    features['rv_cc'] = close_to_close(df, window)
+    has_ohlc = all(c in df.columns for c in ('Open', 'High', 'Low'))
+    if has_ohlc:
+        features['rv_parkinson'] = parkinson(df, window)
+        features['rv_gk'] = garman_klass(df, window)
+        features['rv_yz'] = yang_zhang(df, window)
+    features['ewma_vol'] = ewma_vol(returns, lam)
+
+    summary = {'garch': None, 'garch_vol': np.nan}
+    valid = returns.dropna()
+    if len(valid) > 50:
+        garch = fit_garch(valid.values)
+        features.loc[valid.index, 'garch_vol'] = np.sqrt(garch['variance'] * TRADING_DAYS)
+        summary['garch'] = {k: garch[k] for k in ('omega', 'alpha', 'beta', 'converged')}
+        summary['garch_vol'] = garch_forecast(garch, horizon)
+
+    rv = features['rv_yz' if has_ohlc else 'rv_cc']
+    current = rv.iloc[-1]
+    history = rv.dropna().tail(TRADING_DAYS)
+    pct = float((history <= current).mean()) if len(history) else np.nan
+    summary.update({
+        'rv': float(current),
+        'ewma_vol': float(features['ewma_vol'].iloc[-1]),
+        'rv_percentile': pct,
+        'regime': 'high' if pct > 0.67 else 'low' if pct < 0.33 else 'normal',
+    })
+    # Forward-looking sigma: GARCH forecast when it fit, else EWMA, else realized.
+    for candidate in (summary['garch_vol'], summary['ewma_vol'], summary['rv']):
+        if candidate is not None and np.isfinite(candidate):
+            summary['sigma'] = float(candidate)
+            break
+    else:
+        summary['sigma'] = np.nan
+    result = (features, summary)
+    if symbol is not None:
+        _cache[symbol] = (stamp, result)
+    return result